@@ -0,0 +1,225 @@
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+import os
+
+from Auth_Database_Models import *
+from request_log import timed
+
+# Sync driver -> async driver used when ASYNC_DATABASE_URL is not set
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url():
+    """
+    Get the async database URL, derived from DATABASE_URL unless ASYNC_DATABASE_URL is set.
+    """
+    if os.getenv('ASYNC_DATABASE_URL'):
+        return os.getenv('ASYNC_DATABASE_URL')
+
+    url = make_url(os.getenv('DATABASE_URL'))
+    drivername = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=drivername)
+
+
+class AsyncAuthDatabase:
+    """
+    Async counterpart of AuthDatabase, so queries issued from async handlers do not block the event loop.
+    """
+
+    def __init__(self):
+        load_dotenv()
+
+        # Same pool settings as the sync engine
+        self.engine = create_async_engine(
+            get_async_database_url(),
+            pool_size=10,          # Number of connections to maintain in pool
+            max_overflow=20,       # Additional connections beyond pool_size
+            pool_timeout=30,       # Seconds to wait for connection from pool
+            pool_recycle=3600,     # Seconds before recreating connections (prevents stale connections)
+            pool_pre_ping=True,    # Validate connections before use
+            echo=False             # Set to True for SQL debugging
+        )
+
+        # expire_on_commit=False keeps loaded attributes usable after the session commits
+        self.SessionLocal = async_sessionmaker(bind=self.engine, autoflush=False, expire_on_commit=False)
+
+    async def init_models(self):
+        """
+        Create all tables if they don't exist.
+        """
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    @asynccontextmanager
+    async def get_db_session(self):
+        """
+        Async context manager for database sessions.
+        Automatically handles session cleanup and error rollback.
+        Session time is reported as the request's "db" timing.
+        """
+        with timed("db"):
+            async with self.SessionLocal() as session:
+                try:
+                    yield session
+                    await session.commit()  # Auto-commit if no exceptions
+                except Exception:
+                    await session.rollback()
+                    raise
+
+    async def check_api_key(self, api_key: str) -> bool:
+        """
+        Check if the provided API key is valid.
+        """
+        async with self.get_db_session() as db:
+            result = await db.execute(select(ApiKey.id).where(ApiKey.api_key == api_key))
+            return result.first() is not None
+
+    async def get_user_by_api_key(self, api_key: str):
+        """
+        Get the user associated with the provided API key.
+        """
+        async with self.get_db_session() as db:
+            result = await db.execute(select(User).join(ApiKey).where(ApiKey.api_key == api_key))
+            user_obj = result.scalars().first()
+            user = user_obj.to_dict() if user_obj else None
+            return user
+
+    async def get_principal_by_api_key(self, api_key: str):
+        """
+        Validate an API key and load its owner's id and username in a single joined query.
+        Returns None if the key does not exist.
+        """
+        async with self.get_db_session() as db:
+            result = await db.execute(
+                select(User.id, User.username).join(ApiKey).where(ApiKey.api_key == api_key)
+            )
+            row = result.first()
+            principal = {"id": row.id, "username": row.username} if row else None
+            return principal
+
+    async def get_user_api_keys(self, user_id: int):
+        """
+        Get all API keys associated with the provided user ID.
+        """
+        async with self.get_db_session() as db:
+            result = await db.execute(select(ApiKey).where(ApiKey.user_id == user_id))
+            api_keys = result.scalars().all()
+            if not api_keys:
+                return None
+            #serialize the objects to dictionary containing all data
+            api_keys = [api_key.to_dict() for api_key in api_keys]
+
+            return api_keys
+
+    async def create_user(self, username: str, password_hash: str):
+        """
+        Create a new user.
+        """
+        async with self.get_db_session() as db:
+            user = User(username=username, password_hash=password_hash)
+            db.add(user)
+            await db.flush()
+            user_id = user.id
+
+            return user_id
+
+    async def create_api_key(self, user_id: int, api_key: str):
+        """
+        Create a new API key for a user.
+        """
+        async with self.get_db_session() as db:
+            api_key_obj = ApiKey(user_id=user_id, api_key=api_key)
+            db.add(api_key_obj)
+            await db.flush()
+
+            return api_key
+
+    async def get_user_by_username(self, username: str):
+        """
+        Get user by username.
+        """
+        async with self.get_db_session() as db:
+            result = await db.execute(select(User).where(User.username == username))
+            user_obj = result.scalars().first()
+            user = {
+                "id": user_obj.id,
+                "username": user_obj.username,
+                "password_hash": user_obj.password_hash
+            } if user_obj else None
+            return user
+
+    async def delete_api_key(self, api_key: str) -> bool:
+        """
+        Delete/revoke an API key.
+        """
+        async with self.get_db_session() as db:
+            result = await db.execute(select(ApiKey).where(ApiKey.api_key == api_key))
+            api_key_obj = result.scalars().first()
+            if api_key_obj:
+                await db.delete(api_key_obj)
+                return True
+            return False
+
+    async def record_usage(self, records: list):
+        """
+        Insert a batch of usage records (dicts of UsageRecord columns) in one statement.
+        """
+        if not records:
+            return
+        async with self.get_db_session() as db:
+            await db.execute(insert(UsageRecord), records)
+
+    async def get_usage_summary(self, user_id: int, since):
+        """
+        Get a user's usage since the given time, aggregated per endpoint.
+        """
+        async with self.get_db_session() as db:
+            result = await db.execute(
+                select(
+                    UsageRecord.endpoint,
+                    func.count().label("requests"),
+                    func.coalesce(func.sum(UsageRecord.tokens_used), 0).label("tokens_used"),
+                    func.coalesce(func.sum(case((UsageRecord.cache_hit, 1), else_=0)), 0).label("cache_hits"),
+                    func.avg(UsageRecord.latency_ms).label("avg_latency_ms")
+                )
+                .where(UsageRecord.user_id == user_id, UsageRecord.created_at >= since)
+                .group_by(UsageRecord.endpoint)
+                .order_by(UsageRecord.endpoint)
+            )
+            return [
+                {
+                    "endpoint": row.endpoint,
+                    "requests": row.requests,
+                    "tokens_used": int(row.tokens_used),
+                    "cache_hits": int(row.cache_hits),
+                    "avg_latency_ms": round(float(row.avg_latency_ms or 0), 1)
+                }
+                for row in result
+            ]
+
+    async def close_all_connections(self):
+        """
+        Close all connections in the pool. Call this when shutting down the server.
+        """
+        await self.engine.dispose()
+
+    def get_pool_status(self):
+        """
+        Get current connection pool status for monitoring.
+        """
+        pool = self.engine.pool
+        return {
+            "pool_size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow()
+        }
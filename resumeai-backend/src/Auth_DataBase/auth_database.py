@@ -76,6 +76,16 @@ class AuthDatabase:
             user = user_obj.to_dict() if user_obj else None
             return user
 
+    def get_principal_by_api_key(self, api_key: str):
+        """
+        Validate an API key and load its owner's id and username in a single joined query.
+        Returns None if the key does not exist.
+        """
+        with self.get_db_session() as db:
+            row = db.query(User.id, User.username).join(ApiKey).filter(ApiKey.api_key == api_key).first()
+            principal = {"id": row.id, "username": row.username} if row else None
+            return principal
+
     def get_user_api_keys(self, user_id: int):
         """
         Get all API keys associated with the provided user ID.
@@ -162,6 +172,5 @@ class AuthDatabase:
             "pool_size": pool.size(),
             "checked_in": pool.checkedin(),
             "checked_out": pool.checkedout(),
-            "overflow": pool.overflow(),
-            "invalid": pool.invalid()
+            "overflow": pool.overflow()
         }
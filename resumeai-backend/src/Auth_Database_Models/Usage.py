@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, TIMESTAMP, Boolean, text, ForeignKey, Index
+from Auth_Database_Models.Base import Base
+
+
+class UsageRecord(Base):
+    __tablename__ = "usage_records"
+
+    id = Column(Integer, primary_key=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    endpoint = Column(String(100), nullable=False)
+    tokens_used = Column(Integer, nullable=False, server_default=text('0'))
+    latency_ms = Column(Integer, nullable=False)
+    cache_hit = Column(Boolean, nullable=False, server_default=text('false'))
+    created_at = Column(TIMESTAMP(timezone=True), server_default=text('CURRENT_TIMESTAMP'))
+
+    __table_args__ = (Index("ix_usage_records_user_id_created_at", "user_id", "created_at"),)
+
+    def to_dict(self):
+        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
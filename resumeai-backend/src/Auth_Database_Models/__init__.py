@@ -1,5 +1,6 @@
 # models/__init__.py
 from .Users import User
 from .API_Keys import ApiKey
+from .Usage import UsageRecord
 from .Base import Base
 # This ensures these models are loaded when importing from models
\ No newline at end of file
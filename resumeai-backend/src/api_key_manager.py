@@ -2,16 +2,79 @@
 import os
 import secrets
 import hashlib
+import threading
+from typing import Optional
 from fastapi import HTTPException, Security
 from fastapi.security import APIKeyHeader
 from Auth_DataBase.auth_database import AuthDatabase
+from Auth_DataBase.async_auth_database import AsyncAuthDatabase
+from models import Principal
+from utility_func import TTLCache
+
+# Cache marker for keys that do not exist, so repeated bad keys skip the database too
+_INVALID_KEY = False
 
 class APIKeyManager:
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, async_auth_db: AsyncAuthDatabase = None, auth_db: AuthDatabase = None):
         self.logger = logger
-        self.auth_db = AuthDatabase()
+        self._auth_db = auth_db
+        self._auth_db_lock = threading.Lock()
+        self.async_auth_db = async_auth_db or AsyncAuthDatabase()
         self.api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
+        # Per-process cache of key -> Principal (or _INVALID_KEY), so steady-state requests skip the database.
+        # Revocations are applied immediately in this process and within the TTL everywhere else.
+        self.key_cache = TTLCache(
+            maxsize=int(os.getenv('API_KEY_CACHE_SIZE', 10000)),
+            ttl=float(os.getenv('API_KEY_CACHE_TTL', 300))
+        )
+        self.negative_cache_ttl = float(os.getenv('API_KEY_NEGATIVE_CACHE_TTL', 30))
+
+    @property
+    def auth_db(self) -> AuthDatabase:
+        """
+        Sync database, opened on first use so async-only callers never build its pool or create its tables
+        """
+        with self._auth_db_lock:
+            if self._auth_db is None:
+                self._auth_db = AuthDatabase()
+            return self._auth_db
+
+    def resolve_principal(self, api_key: str) -> Optional[Principal]:
+        """
+        Resolve an API key to its Principal through the cache, using a single joined query on a miss.
+        Returns None for unknown keys.
+        """
+        entry = self.key_cache.get(api_key)
+        if entry is not None:
+            return entry or None
+
+        user_obj = self.auth_db.get_principal_by_api_key(api_key)
+        return self._cache_principal(api_key, user_obj)
+
+    async def aresolve_principal(self, api_key: str) -> Optional[Principal]:
+        """
+        Async version of resolve_principal that queries through the async engine on a miss.
+        """
+        entry = self.key_cache.get(api_key)
+        if entry is not None:
+            return entry or None
+
+        user_obj = await self.async_auth_db.get_principal_by_api_key(api_key)
+        return self._cache_principal(api_key, user_obj)
+
+    def _cache_principal(self, api_key: str, user_obj) -> Optional[Principal]:
+        """
+        Store the result of a principal lookup, negatively caching unknown keys
+        """
+        if user_obj:
+            principal = Principal(user_id=user_obj['id'], username=user_obj['username'], api_key=api_key)
+            self.key_cache.set(api_key, principal)
+            return principal
+
+        self.key_cache.set(api_key, _INVALID_KEY, ttl=self.negative_cache_ttl)
+        return None
+
     def generate_new_api_key(self, user_id: int):
         """
         Generate and store a new API key for a specific user
@@ -19,17 +82,34 @@ class APIKeyManager:
         new_key = secrets.token_urlsafe(32)
         try:
             api_key_obj = self.auth_db.create_api_key(user_id, new_key)
+            self.invalidate_api_key(new_key)  # Drop any negative entry for this key
             if self.logger:
-                self.logger.info(f"New API key generated for user {user_id}")
+                self.logger.info("New API key generated for user %s", user_id)
             return new_key
         except Exception as e:
             if self.logger:
-                self.logger.error(f"Failed to create API key for user {user_id}: {str(e)}")
+                self.logger.error("Failed to create API key for user %s: %s", user_id, e)
             raise e
 
-    async def validate_api_key(self, api_key: str = Security(APIKeyHeader(name="X-API-Key", auto_error=False))):
+    async def agenerate_new_api_key(self, user_id: int):
         """
-        Validate the API key from the request header
+        Async version of generate_new_api_key
+        """
+        new_key = secrets.token_urlsafe(32)
+        try:
+            await self.async_auth_db.create_api_key(user_id, new_key)
+            self.invalidate_api_key(new_key)  # Drop any negative entry for this key
+            if self.logger:
+                self.logger.info("New API key generated for user %s", user_id)
+            return new_key
+        except Exception as e:
+            if self.logger:
+                self.logger.error("Failed to create API key for user %s: %s", user_id, e)
+            raise e
+
+    async def authenticate(self, api_key: str) -> Principal:
+        """
+        Validate the API key and return the Principal it belongs to
         """
         if not api_key:
             if self.logger:
@@ -39,17 +119,24 @@ class APIKeyManager:
                 detail="API key required"
             )
         
-        is_valid = self.auth_db.check_api_key(api_key)
-        if not is_valid:
+        principal = await self.aresolve_principal(api_key)
+        if principal is None:
             if self.logger:
-                self.logger.error(f"Invalid API key attempted: {api_key}") # No need to truncate an invalid API key
+                self.logger.error("Invalid API key attempted: %s", api_key) # No need to truncate an invalid API key
             raise HTTPException(
                 status_code=403,
                 detail="Invalid API key"
             )
         
         if self.logger:
-            self.logger.info(f"Valid API key used: {api_key[:8]}...")
+            self.logger.info("Valid API key used: %s...", api_key[:8])
+        return principal
+
+    async def validate_api_key(self, api_key: str = Security(APIKeyHeader(name="X-API-Key", auto_error=False))):
+        """
+        Validate the API key from the request header
+        """
+        await self.authenticate(api_key)
         return api_key
 
     def get_user_from_api_key(self, api_key: str):
@@ -57,20 +144,53 @@ class APIKeyManager:
         Get the user associated with the provided API key
         """
         try:
-            user_obj = self.auth_db.get_user_by_api_key(api_key)
+            principal = self.resolve_principal(api_key)
+            if principal is None:
+                return None
             user = {
-                "id": user_obj['id'],
-                "username": user_obj['username'],
+                "id": principal.user_id,
+                "username": principal.username,
             }
             return user
         except Exception as e:
             if self.logger:
-                self.logger.error(f"Error getting user for API key: {str(e)}")
+                self.logger.error("Error getting user for API key: %s", e)
             return None
 
-    def revoke_api_key(self, api_key: str):
+    def invalidate_api_key(self, api_key: str):
+        """
+        Drop a key from the lookup cache so the next request re-reads it from the database
+        """
+        self.key_cache.pop(api_key)
+
+    def delete_api_key(self, api_key: str) -> bool:
+        """
+        Delete an API key and evict it from the lookup cache
+        """
+        deleted = self.auth_db.delete_api_key(api_key)
+        self.invalidate_api_key(api_key)
+        if deleted and self.logger:
+            self.logger.info("API key revoked: %s...", api_key[:8])
+        return deleted
+
+    async def adelete_api_key(self, api_key: str) -> bool:
+        """
+        Async version of delete_api_key
+        """
+        deleted = await self.async_auth_db.delete_api_key(api_key)
+        self.invalidate_api_key(api_key)
+        if deleted and self.logger:
+            self.logger.info("API key revoked: %s...", api_key[:8])
+        return deleted
+
+    def revoke_api_key(self, api_key: str) -> bool:
+        """
+        Revoke/delete an API key
+        """
+        return self.delete_api_key(api_key)
+
+    def cache_stats(self):
         """
-        Revoke/delete an API key (you'll need to implement this in AuthDatabase)
+        Get API key cache hit/miss counters for monitoring
         """
-        # You can implement this method in AuthDatabase if needed
-        pass
\ No newline at end of file
+        return self.key_cache.stats()
@@ -0,0 +1,92 @@
+"""
+Benchmark API key lookups through the sync AuthDatabase against AsyncAuthDatabase.
+
+Both paths are driven from an event loop the way main.py calls them, so the sync
+numbers include the time the loop spends blocked on each query.
+
+Usage (from resumeai-backend/src):
+    python -m benchmarks.bench_auth_db --requests 500 --concurrency 50
+
+Uses DATABASE_URL when set, otherwise a throwaway SQLite database.
+"""
+import argparse
+import asyncio
+import os
+import secrets
+import statistics
+import tempfile
+import time
+
+from benchmarks.harness import percentile
+
+
+def report(name, latencies, elapsed):
+    print(
+        f"{name:<28} {len(latencies) / elapsed:>10.1f} req/s"
+        f"  p50={percentile(latencies, 50) * 1000:.2f}ms"
+        f"  p95={percentile(latencies, 95) * 1000:.2f}ms"
+        f"  mean={statistics.fmean(latencies) * 1000:.2f}ms"
+    )
+
+
+async def run_sync(auth_db, api_key, requests, concurrency):
+    latencies = []
+
+    async def one():
+        start = time.perf_counter()
+        auth_db.get_principal_by_api_key(api_key)  # blocks the loop, like a sync call in an async handler
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for offset in range(0, requests, concurrency):
+        await asyncio.gather(*(one() for _ in range(min(concurrency, requests - offset))))
+    return latencies, time.perf_counter() - start
+
+
+async def run_async(async_auth_db, api_key, requests, concurrency):
+    latencies = []
+
+    async def one():
+        start = time.perf_counter()
+        await async_auth_db.get_principal_by_api_key(api_key)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for offset in range(0, requests, concurrency):
+        await asyncio.gather(*(one() for _ in range(min(concurrency, requests - offset))))
+    return latencies, time.perf_counter() - start
+
+
+async def main(args):
+    if not os.getenv('DATABASE_URL'):
+        db_path = os.path.join(tempfile.mkdtemp(), 'bench_auth.db')
+        os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+
+    # Imported late so DATABASE_URL is set before the engines are created
+    from Auth_DataBase.auth_database import AuthDatabase
+    from Auth_DataBase.async_auth_database import AsyncAuthDatabase
+
+    auth_db = AuthDatabase()
+    async_auth_db = AsyncAuthDatabase()
+
+    user_id = auth_db.create_user(f"bench-{secrets.token_hex(4)}", secrets.token_hex(32))
+    api_key = auth_db.create_api_key(user_id, secrets.token_urlsafe(32))
+
+    # Warm both pools before measuring
+    await run_sync(auth_db, api_key, 10, 1)
+    await run_async(async_auth_db, api_key, 10, 1)
+
+    print(f"{args.requests} lookups, concurrency {args.concurrency}")
+    report("sync AuthDatabase", *await run_sync(auth_db, api_key, args.requests, args.concurrency))
+    report("async AsyncAuthDatabase", *await run_async(async_auth_db, api_key, args.requests, args.concurrency))
+
+    auth_db.delete_api_key(api_key)
+    auth_db.close_all_connections()
+    await async_auth_db.close_all_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
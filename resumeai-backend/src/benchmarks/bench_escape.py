@@ -0,0 +1,67 @@
+"""
+Time the LaTeX escaper against the old one-replace-per-character escaper on large payloads.
+tests/test_escape.py checks its output.
+
+Usage (from resumeai-backend/src):
+    python -m benchmarks.bench_escape --runs 50
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.payloads import make_resume_payload
+from resume_creator import LATEX_SPECIAL_CHARS, escape_dict_values
+
+
+def replace_escape_latex(text):
+    """
+    The previous escaper: one str.replace pass per special character.
+    """
+    if not isinstance(text, str):
+        text = str(text)
+    for char, escaped in LATEX_SPECIAL_CHARS.items():
+        text = text.replace(char, escaped)
+    return text
+
+
+def replace_escape_dict_values(data):
+    """
+    The previous in-place traversal, kept for timing.
+    """
+    for key, value in data.items():
+        if isinstance(value, str):
+            data[key] = replace_escape_latex(value)
+        elif isinstance(value, dict):
+            replace_escape_dict_values(value)
+        elif isinstance(value, list):
+            for i, item in enumerate(value):
+                if isinstance(item, str):
+                    value[i] = replace_escape_latex(item)
+                elif isinstance(item, dict):
+                    replace_escape_dict_values(item)
+
+
+def bench(escape, size, runs):
+    latencies = []
+    for _ in range(runs):
+        payload = make_resume_payload(size, size)
+        start = time.perf_counter()
+        escape(payload)
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies)
+
+
+def main(args):
+    for size in (1, 50, 500):
+        old = bench(replace_escape_dict_values, size, args.runs)
+        new = bench(escape_dict_values, size, args.runs)
+        print(
+            f"{size:>3} experiences/projects  replace p50={old * 1000:.3f}ms"
+            f"  single-pass p50={new * 1000:.3f}ms  ({old / new:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=50)
+    main(parser.parse_args())
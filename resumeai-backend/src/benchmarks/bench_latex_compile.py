@@ -0,0 +1,52 @@
+"""
+Benchmark per-resume PDF compile latency for each compile backend (latexmk, direct pdflatex),
+with and without the precompiled template format.
+
+Usage (from resumeai-backend/src, with latexmk and pdflatex installed):
+    python -m benchmarks.bench_latex_compile --runs 20
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.harness import percentile
+from benchmarks.payloads import make_resume_payload
+from latex_format import precompiled_formats
+from resume_creator import COMPILE_BACKENDS, ResumeTexGenerator
+
+
+def bench(backend: str, use_format: bool, runs: int):
+    latencies = []
+    for _ in range(runs):
+        generator = ResumeTexGenerator(
+            make_resume_payload(experiences=3, projects=3), use_format=use_format, compile_backend=backend
+        )
+        generator.generate_tex()  # Only the compile itself is measured
+        start = time.perf_counter()
+        generator.build_pdf()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main(args):
+    start = time.perf_counter()
+    fmt = precompiled_formats.get(ResumeTexGenerator(make_resume_payload()).tex_template)
+    if fmt is None:
+        raise SystemExit("Could not build the precompiled format; check that pdflatex and mylatexformat are installed")
+    print(f"format {fmt.name} ready in {time.perf_counter() - start:.2f}s")
+
+    for backend in COMPILE_BACKENDS:
+        for preamble, use_format in (("full preamble", False), ("precompiled format", True)):
+            label = f"{backend}, {preamble}"
+            latencies = bench(backend, use_format, args.runs)
+            print(
+                f"{label:<30} p50={percentile(latencies, 50) * 1000:.0f}ms"
+                f"  p95={percentile(latencies, 95) * 1000:.0f}ms"
+                f"  mean={statistics.fmean(latencies) * 1000:.0f}ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,39 @@
+"""
+Time the string renderer against the TexSoup renderer. tests/test_tex_render.py checks that
+they produce byte-identical output.
+
+Usage (from resumeai-backend/src):
+    python -m benchmarks.bench_tex_render --runs 20
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.payloads import make_resume_payload
+from resume_creator import ResumeTexGenerator
+
+
+def bench(renderer, experiences, projects, runs):
+    latencies = []
+    for _ in range(runs):
+        generator = ResumeTexGenerator(make_resume_payload(experiences, projects), renderer=renderer)
+        start = time.perf_counter()
+        generator.generate_tex()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies)
+
+
+def main(args):
+    for size in (1, 10, 50):
+        texsoup = bench("texsoup", size, size, args.runs)
+        string_renderer = bench("string", size, size, args.runs)
+        print(
+            f"{size:>2} experiences/projects  texsoup p50={texsoup * 1000:.2f}ms"
+            f"  string p50={string_renderer * 1000:.3f}ms  ({texsoup / string_renderer:.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    main(parser.parse_args())
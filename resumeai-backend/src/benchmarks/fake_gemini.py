@@ -0,0 +1,119 @@
+"""
+Local stand-in for the Gemini REST API, for testing and load runs without a real key.
+
+Start it and point the app at it:
+    FAKE_GEMINI_LATENCY=1.5 uvicorn benchmarks.fake_gemini:app --port 8090
+    GEMINI_TRANSPORT=rest GEMINI_API_ENDPOINT=http://127.0.0.1:8090 uvicorn main:app
+
+FAKE_GEMINI_LATENCY is the mean response latency in seconds, FAKE_GEMINI_JITTER the
++/- fraction applied to it and FAKE_GEMINI_WORDS the length of the generated text.
+Streamed responses spread the latency over FAKE_GEMINI_CHUNKS chunks. Requests for JSON output
+get a JSON array with as many texts as the prompt's "exactly N strings" asks for.
+
+Benchmarks can also run it in-process with serve_in_thread().
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+FAKE_GEMINI_LATENCY = float(os.getenv('FAKE_GEMINI_LATENCY', 0.5))
+FAKE_GEMINI_JITTER = float(os.getenv('FAKE_GEMINI_JITTER', 0.2))
+FAKE_GEMINI_WORDS = int(os.getenv('FAKE_GEMINI_WORDS', 60))
+FAKE_GEMINI_CHUNKS = int(os.getenv('FAKE_GEMINI_CHUNKS', 5))
+
+app = FastAPI(title="Fake Gemini")
+
+
+def fake_latency():
+    return max(0.0, FAKE_GEMINI_LATENCY * random.uniform(1 - FAKE_GEMINI_JITTER, 1 + FAKE_GEMINI_JITTER))
+
+
+def fake_text():
+    return " ".join(f"word{i}" for i in range(FAKE_GEMINI_WORDS)) + "."
+
+
+def prompt_text(body: dict):
+    return "".join(
+        part.get("text", "")
+        for content in body.get("contents", [])
+        for part in content.get("parts", [])
+    )
+
+
+def prompt_tokens(body: dict):
+    return max(1, len(prompt_text(body)) // 4)
+
+
+def reply_text(body: dict):
+    generation_config = body.get("generationConfig", {})
+    if generation_config.get("responseMimeType", generation_config.get("response_mime_type")) != "application/json":
+        return fake_text()
+    # Prompts are whitespace-stripped by reduce_tokens
+    match = re.search(r"exactly\s*(\d+)\s*strings", prompt_text(body))
+    return json.dumps([fake_text()] * (int(match.group(1)) if match else 1))
+
+
+def candidate_response(text: str, prompt_token_count: int, candidates_token_count: int):
+    return {
+        "candidates": [{
+            "content": {"parts": [{"text": text}], "role": "model"},
+            "finishReason": "STOP",
+            "index": 0
+        }],
+        "usageMetadata": {
+            "promptTokenCount": prompt_token_count,
+            "candidatesTokenCount": candidates_token_count,
+            "totalTokenCount": prompt_token_count + candidates_token_count
+        }
+    }
+
+
+@app.post("/v1beta/models/{model}:generateContent")
+async def generate_content(model: str, request: Request):
+    body = await request.json()
+    await asyncio.sleep(fake_latency())
+    return candidate_response(reply_text(body), prompt_tokens(body), FAKE_GEMINI_WORDS)
+
+
+@app.post("/v1beta/models/{model}:streamGenerateContent")
+async def stream_generate_content(model: str, request: Request):
+    body = await request.json()
+    words = fake_text().split(" ")
+    per_chunk = max(1, len(words) // FAKE_GEMINI_CHUNKS)
+    delay = fake_latency() / FAKE_GEMINI_CHUNKS
+
+    async def chunks():
+        # The REST transport reads the stream as one JSON array
+        yield "["
+        for start in range(0, len(words), per_chunk):
+            await asyncio.sleep(delay)
+            text = " ".join(words[start:start + per_chunk]) + " "
+            payload = candidate_response(text, prompt_tokens(body), min(len(words), start + per_chunk))
+            yield ("," if start else "") + json.dumps(payload)
+        yield "]"
+
+    return StreamingResponse(chunks(), media_type="application/json")
+
+
+def serve_in_thread(port: int = 0):
+    """
+    Serve the fake on 127.0.0.1 from a daemon thread (port 0 picks a free port).
+    Returns (server, endpoint URL); set server.should_exit = True to stop it.
+    """
+    # log_config=None leaves the host process's logging alone
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_config=None, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="fake-gemini", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("Fake Gemini server failed to start")
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}"
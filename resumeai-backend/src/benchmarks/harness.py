@@ -0,0 +1,147 @@
+"""
+Shared measurement and reporting for the benchmarks: percentiles, timing loops, a results table
+and JSON baselines, so a later run on the same machine shows which numbers regressed.
+"""
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Measurement:
+    """
+    Per-operation latencies (seconds) of one benchmark and the wall time its operations took together.
+    """
+
+    def __init__(self, name: str, latencies: list, elapsed: float, operations: int = None):
+        self.name = name
+        self.latencies = latencies
+        self.elapsed = elapsed
+        self.operations = operations or len(latencies)
+
+    def summary(self):
+        return {
+            "runs": len(self.latencies),
+            "throughput": self.operations / self.elapsed,
+            "mean": statistics.fmean(self.latencies),
+            "p50": percentile(self.latencies, 50),
+            "p95": percentile(self.latencies, 95),
+            "p99": percentile(self.latencies, 99),
+        }
+
+
+def measure(name: str, fn, runs: int, setup=None, warmup: int = 3, inner: int = 1) -> Measurement:
+    """
+    Time fn() runs times, or fn(setup()) with setup excluded from the timing. Operations too fast
+    to time one by one can be repeated inner times per sample; latencies are per call.
+    """
+    for _ in range(warmup):
+        fn(setup()) if setup else fn()
+    gc.collect()
+    latencies = []
+    for _ in range(runs):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        for _ in range(inner):
+            fn(arg) if setup else fn()
+        latencies.append((time.perf_counter() - start) / inner)
+    return Measurement(name, latencies, sum(latencies) * inner, operations=runs * inner)
+
+
+async def measure_async(name: str, fn, runs: int, concurrency: int = 1, warmup: int = 3) -> Measurement:
+    """
+    Time runs awaits of fn() with up to concurrency in flight; throughput is over the wall time.
+    """
+    for _ in range(warmup):
+        await fn()
+    gc.collect()
+    latencies = []
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with slots:
+            start = time.perf_counter()
+            await fn()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(runs)))
+    return Measurement(name, latencies, time.perf_counter() - start)
+
+
+def environment():
+    """
+    What a baseline was measured on, so comparisons across machines or settings can be spotted.
+    """
+    settings = ("RESUME_RENDERER", "LATEX_COMPILE_BACKEND", "LATEX_PRECOMPILED_FORMAT", "LATEX_COMPILE_WORKERS")
+    return {
+        "machine": platform.node(),
+        "platform": platform.platform(),
+        "python": sys.version.split()[0],
+        "cpus": os.cpu_count(),
+        "settings": {name: os.getenv(name) for name in settings if os.getenv(name)},
+    }
+
+
+class Report:
+    """
+    Collects measurements, prints them next to a saved baseline and flags regressions: a p50 or
+    p95 more than `tolerance` (a fraction) above the baseline's.
+    """
+
+    def __init__(self, baseline_path: Path = None, tolerance: float = 0.15):
+        self.baseline_path = baseline_path
+        self.tolerance = tolerance
+        self.results = {}
+        self.regressions = []
+        self.baseline = {}
+        if baseline_path and baseline_path.exists():
+            saved = json.loads(baseline_path.read_text())
+            self.baseline = saved["results"]
+            if saved["environment"]["machine"] != platform.node():
+                print(f"note: baseline was recorded on {saved['environment']['machine']}, not this machine")
+        print(f"{'benchmark':<48} {'runs':>5} {'ops/s':>10} {'p50':>10} {'p95':>10} {'p99':>10}  vs baseline p50")
+
+    def add(self, measurement: Measurement):
+        summary = measurement.summary()
+        self.results[measurement.name] = summary
+        line = (
+            f"{measurement.name:<48} {summary['runs']:>5} {summary['throughput']:>10.1f}"
+            f" {summary['p50'] * 1000:>8.3f}ms {summary['p95'] * 1000:>8.3f}ms {summary['p99'] * 1000:>8.3f}ms"
+        )
+        baseline = self.baseline.get(measurement.name)
+        if baseline:
+            change = summary["p50"] / baseline["p50"] - 1
+            line += f"  {change:+.1%}"
+            regressed = [
+                stat for stat in ("p50", "p95")
+                if summary[stat] > baseline[stat] * (1 + self.tolerance)
+            ]
+            if regressed:
+                self.regressions.append((measurement.name, regressed))
+                line += f"  REGRESSION ({', '.join(regressed)})"
+        print(line, flush=True)
+
+    def save(self, path: Path, merge: bool = False):
+        """
+        Write the results as JSON. With merge, results of benchmarks not run this time are kept
+        from the loaded baseline.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "environment": environment(),
+            "results": {**self.baseline, **self.results} if merge else self.results,
+        }, indent=2) + "\n")
+        print(f"results saved to {path}")
@@ -0,0 +1,86 @@
+"""
+Synthetic request payloads for benchmarks.
+"""
+
+
+def make_resume_payload(experiences: int = 1, projects: int = 1, output_format: str = "pdf") -> dict:
+    """
+    Build a fresh request dict with the given number of experience and project entries.
+    Text includes LaTeX special characters.
+    """
+    return {
+        "information": {
+            "name": "John Doe",
+            "email": "john_doe@example.com",
+            "phone": "01123456789",
+            "address": "123 Example Street",
+            "linkedin": "linkedin.com/in/example",
+            "github": "github.com/example",
+            "summary": "Software engineer with 5+ years of experience & a track record of 40% latency cuts"
+        },
+        "education": [{
+            "degree": "BSc Computer Science",
+            "school": "Example University",
+            "start_date": "2016",
+            "end_date": "2020",
+            "location": "Tanta, Egypt",
+            "gpa": "3.5"
+        }],
+        "experience": [{
+            "title": f"Software Engineer #{i}",
+            "company": f"Example Company {i}",
+            "start_date": "2020",
+            "end_date": "Present",
+            "description": "Built C# & Python services handling 10k req/s. Reduced cloud spend by 25%. Led a team of 4_engineers"
+        } for i in range(experiences)],
+        "projects": [{
+            "name": f"Project {i}",
+            "skills": "Python, FastAPI, Google Gemini AI, PyTest, Pydantic",
+            "description": "Designed a resume builder with $0 infra cost. Cut compile time by 60%",
+            "end_date": "2022"
+        } for i in range(projects)],
+        "technical_skills": {
+            "Programming Languages": ["Python", "C#", "C++"],
+            "Tools": ["Git", "Docker", "~/bin scripts"],
+            "Other Skills": ["AWS", "Azure"]
+        },
+        "soft_skills": ["Communication", "Problem Solving"],
+        "output_format": output_format
+    }
+
+
+def make_cover_letter_payload(variant: int = 0) -> dict:
+    """
+    CoverLetterRequest; different variants give different prompts, so they never share a cache entry.
+    """
+    return {
+        "job_post": f"Backend Engineer #{variant}: build Python & FastAPI services, 3+ years of experience",
+        "user_name": "John Doe",
+        "user_degree": "BSc Computer Science",
+        "user_title": "Software Engineer",
+        "user_experience": "5 years building APIs and data pipelines",
+        "user_skills": "Python, FastAPI, PostgreSQL, Docker, AWS"
+    }
+
+
+def make_summary_payload(variant: int = 0) -> dict:
+    """
+    SummaryRequest; see make_cover_letter_payload for variant.
+    """
+    return {
+        "current_title": f"Software Engineer #{variant}",
+        "years_experience": "5",
+        "skills": "Python, FastAPI, PostgreSQL, Docker",
+        "achievements": "Cut p95 latency by 40%"
+    }
+
+
+def make_project_payload(variant: int = 0) -> dict:
+    """
+    ProjectDescriptionRequest; see make_cover_letter_payload for variant.
+    """
+    return {
+        "project_name": f"Resume Builder #{variant}",
+        "skills": "Python, FastAPI, LaTeX",
+        "project_description": "Generates resumes from structured data"
+    }
@@ -0,0 +1,230 @@
+"""
+Benchmark suite for the backend's hot paths. Reports throughput and p50/p95/p99 per benchmark
+and compares them with a saved baseline, so regressions are visible.
+
+Groups:
+  escape   escape_latex and escape_dict_values
+  tex      ResumeTexGenerator.generate_tex for each renderer, 1-50 experiences and projects
+  compile  PDF compilation per compile backend (skipped without latexmk and pdflatex)
+  auth     API key validation, from the database and from the key cache
+  e2e      the HTTP endpoints in-process, with Gemini replaced by benchmarks.fake_gemini
+
+auth and e2e use DATABASE_URL when set (e.g. a local Postgres), otherwise a throwaway SQLite
+database. Payloads are fixed, so runs on the same machine and settings are comparable; the
+baseline file records both.
+
+Usage (from resumeai-backend/src):
+    python -m benchmarks.suite                     # run everything, compare with the baseline
+    python -m benchmarks.suite --only escape,tex   # run some groups
+    python -m benchmarks.suite --save-baseline     # record this run as the baseline
+    python -m benchmarks.suite --check             # exit 1 on any regression, e.g. in CI
+"""
+import argparse
+import asyncio
+import importlib
+import itertools
+import os
+import platform
+import secrets
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.harness import Report, measure, measure_async
+from benchmarks.payloads import (
+    make_cover_letter_payload, make_project_payload, make_resume_payload, make_summary_payload
+)
+
+GROUPS = ("escape", "tex", "compile", "auth", "e2e")
+SIZES = (1, 5, 10, 25, 50)
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+
+def compilers_available(backend: str) -> bool:
+    needed = ("latexmk", "pdflatex") if backend == "latexmk" else ("pdflatex",)
+    return all(shutil.which(program) for program in needed)
+
+
+def bench_escape(report: Report, args):
+    from resume_creator import ESCAPE_MEMO_MAX_LENGTH, escape_dict_values, escape_latex
+
+    short = "C# & 40% of ~/bin"
+    long = "Reduced cloud spend by 25% & led 4_engineers; " * 4
+    assert len(short) <= ESCAPE_MEMO_MAX_LENGTH < len(long)
+    report.add(measure("escape_latex/short (memoized)", lambda: escape_latex(short), args.runs, inner=1000))
+    report.add(measure("escape_latex/long", lambda: escape_latex(long), args.runs, inner=100))
+    for size in SIZES:
+        payload = make_resume_payload(size, size)
+        report.add(measure(f"escape_dict_values/{size}", lambda: escape_dict_values(payload), args.runs))
+
+
+def bench_tex(report: Report, args):
+    from resume_creator import ResumeTexGenerator
+
+    for renderer in ("string", "texsoup"):
+        for size in SIZES:
+            # Escaping happens when the generator is built; only the template fill is timed
+            report.add(measure(
+                f"generate_tex/{renderer}/{size}",
+                lambda generator: generator.generate_tex(),
+                args.runs,
+                setup=lambda: ResumeTexGenerator(make_resume_payload(size, size), renderer=renderer),
+            ))
+
+
+def bench_compile(report: Report, args):
+    from latex_format import precompiled_formats
+    from resume_creator import COMPILE_BACKENDS, DEFAULT_TEMPLATE, ResumeTexGenerator
+
+    precompiled_formats.get(DEFAULT_TEMPLATE)  # build the format up front, not in the first timed run
+    for backend in COMPILE_BACKENDS:
+        if not compilers_available(backend):
+            print(f"build_pdf/{backend}: skipped, compiler not installed")
+            continue
+
+        def setup():
+            generator = ResumeTexGenerator(make_resume_payload(3, 3), compile_backend=backend)
+            generator.generate_tex()
+            return generator
+
+        report.add(measure(
+            f"build_pdf/{backend}", lambda generator: generator.build_pdf(), args.compile_runs, setup=setup, warmup=1
+        ))
+
+
+async def bench_auth(report: Report, args):
+    from api_key_manager import APIKeyManager
+    from Auth_DataBase.async_auth_database import AsyncAuthDatabase
+
+    async_auth_db = AsyncAuthDatabase()
+    await async_auth_db.init_models()
+    manager = APIKeyManager(async_auth_db=async_auth_db)
+    user_id = await async_auth_db.create_user(f"bench-{secrets.token_hex(4)}", secrets.token_hex(32))
+    api_key = await manager.agenerate_new_api_key(user_id)
+    try:
+        concurrency = args.concurrency
+        report.add(await measure_async(
+            f"auth/database c{concurrency}", lambda: async_auth_db.get_principal_by_api_key(api_key),
+            args.runs, concurrency
+        ))
+        report.add(await measure_async(
+            f"auth/cached c{concurrency}", lambda: manager.authenticate(api_key), args.runs, concurrency
+        ))
+    finally:
+        await async_auth_db.delete_api_key(api_key)
+        await async_auth_db.close_all_connections()
+        manager.auth_db.close_all_connections()
+
+
+async def bench_e2e(report: Report, args):
+    import httpx
+    from benchmarks import fake_gemini
+
+    fake_gemini.FAKE_GEMINI_LATENCY = args.gemini_latency
+    server, endpoint = fake_gemini.serve_in_thread()
+    # Read when the app is imported, so set before importing it
+    os.environ.update(
+        GEMINI_TRANSPORT="rest",
+        GEMINI_API_ENDPOINT=endpoint,
+        GEMINI_API_KEY=os.getenv("GEMINI_API_KEY") or "benchmark",
+        RENDER_CACHE_MAX_BYTES="0",
+        QUOTA_TOKENS_PER_MINUTE="0",
+    )
+    os.environ.pop("GENERATION_CACHE_BACKEND", None)
+    app_module = importlib.import_module("main")
+    app_module.limiter.enabled = False
+    # The app's lifespan would also update the production dynamic DNS record, so start only what requests need
+    await app_module.auth_db.init_models()
+    app_module.resume_jobs.start()
+    app_module.usage_meter.start()
+
+    variants = itertools.count()
+    cases = [
+        ("/create-resume", "tex", lambda: make_resume_payload(5, 5, output_format="tex")),
+        ("/generate-summary", "", lambda: make_summary_payload(next(variants))),
+        ("/generate-project-description", "", lambda: make_project_payload(next(variants))),
+        ("/generate-cover-letter", "", lambda: make_cover_letter_payload(next(variants))),
+        ("/generate-summary/stream", "", lambda: make_summary_payload(next(variants))),
+    ]
+    if compilers_available(os.getenv('LATEX_COMPILE_BACKEND', 'latexmk')):
+        cases.insert(1, ("/create-resume", "pdf", lambda: make_resume_payload(5, 5, output_format="pdf")))
+
+    try:
+        transport = httpx.ASGITransport(app=app_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=120) as client:
+            password = secrets.token_hex(16)
+            response = await client.post("/auth/register", json={"username": f"bench-{password[:8]}", "password": password})
+            response.raise_for_status()
+            headers = {"X-API-Key": response.json()["api_key"]}
+
+            async def get_api_keys():
+                (await client.get("/auth/my-api-keys", headers=headers)).raise_for_status()
+
+            report.add(await measure_async(f"e2e GET /auth/my-api-keys c{args.concurrency}", get_api_keys,
+                                           args.runs, args.concurrency))
+            for path, variant, payload in cases:
+                async def post(path=path, payload=payload):
+                    (await client.post(path, json=payload(), headers=headers)).raise_for_status()
+
+                name = f"e2e POST {path}{f' [{variant}]' if variant else ''} c{args.concurrency}"
+                runs = args.compile_runs if variant == "pdf" else args.runs
+                report.add(await measure_async(name, post, runs, args.concurrency))
+    finally:
+        await app_module.resume_jobs.stop()
+        await app_module.usage_meter.stop()
+        app_module.compile_service.shutdown()
+        await app_module.auth_db.close_all_connections()
+        server.should_exit = True
+
+
+async def run_async_groups(report: Report, args, groups):
+    if "auth" in groups:
+        await bench_auth(report, args)
+    if "e2e" in groups:
+        await bench_e2e(report, args)
+
+
+def main(args):
+    groups = args.only.split(",") if args.only else GROUPS
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        raise SystemExit(f"Unknown benchmark groups: {', '.join(sorted(unknown))}")
+    if not os.getenv('DATABASE_URL'):
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    # Keep benchmark traffic out of the shipped application logs unless asked for
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    baseline = Path(args.baseline)
+    report = Report(baseline, tolerance=args.tolerance)
+    if "escape" in groups:
+        bench_escape(report, args)
+    if "tex" in groups:
+        bench_tex(report, args)
+    if "compile" in groups:
+        bench_compile(report, args)
+    asyncio.run(run_async_groups(report, args, groups))
+
+    if args.output:
+        report.save(Path(args.output))
+    if args.save_baseline:
+        report.save(baseline, merge=True)
+    if report.regressions:
+        print(f"{len(report.regressions)} regression(s) beyond {args.tolerance:.0%} of the baseline")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", help=f"comma-separated groups to run ({', '.join(GROUPS)})")
+    parser.add_argument("--runs", type=int, default=50, help="samples per benchmark")
+    parser.add_argument("--compile-runs", type=int, default=10, help="samples per PDF compile benchmark")
+    parser.add_argument("--concurrency", type=int, default=1, help="requests in flight for auth and e2e")
+    parser.add_argument("--gemini-latency", type=float, default=0.0, help="fake Gemini latency in seconds")
+    parser.add_argument("--baseline", default=str(BASELINE_DIR / f"{platform.node()}.json"))
+    parser.add_argument("--tolerance", type=float, default=0.15, help="slowdown counted as a regression")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run's results as the baseline")
+    parser.add_argument("--output", help="also write this run's results to this JSON file")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if anything regressed")
+    main(parser.parse_args())
@@ -0,0 +1,137 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from metrics import COMPILE_SECONDS
+from request_log import add_timing
+
+
+class CompileQueueFull(Exception):
+    """
+    Raised when a compile is submitted while every worker is busy and the wait queue is full.
+    """
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class LatexCompileService:
+    """
+    Runs LaTeX compiles on a fixed set of workers so the event loop never waits on the compiler.
+    Each worker drives one compiler process at a time, so at most `workers` compiles run concurrently
+    and at most `max_queue` more wait for a free worker; anything beyond that is rejected.
+    """
+
+    def __init__(self, workers: int = None, max_queue: int = None):
+        self.workers = workers or int(os.getenv('LATEX_COMPILE_WORKERS', os.cpu_count() or 1))
+        self.max_queue = max_queue if max_queue is not None else int(
+            os.getenv('LATEX_COMPILE_QUEUE_SIZE', self.workers * 4)
+        )
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="latex-compile")
+
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        # Recent samples (seconds) for latency percentiles
+        self.wait_times = deque(maxlen=1024)
+        self.compile_times = deque(maxlen=1024)
+        self.backend_times = {}  # compile backend -> recent compiler wall times
+
+    def submit(self, fn, *args, **kwargs) -> asyncio.Future:
+        """
+        Queue fn(*args, **kwargs) on a compile worker and return an awaitable future for its result.
+        Raises CompileQueueFull immediately if the queue is full.
+        """
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise CompileQueueFull(f"Compile queue is full ({self.queued} waiting)")
+            self.queued += 1
+        submitted_at = time.perf_counter()
+
+        def run():
+            started_at = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.wait_times.append(started_at - submitted_at)
+            add_timing("compile_wait", started_at - submitted_at)
+            succeeded = False
+            try:
+                result = fn(*args, **kwargs)
+                succeeded = True
+                return result
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.compile_times.append(time.perf_counter() - started_at)
+                    if succeeded:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+
+        def release_if_cancelled(future):
+            # A job cancelled before a worker picked it up (its awaiting coroutine was cancelled, or
+            # the service shut down) never runs, so its queue slot is released here instead
+            if future.cancelled():
+                with self._lock:
+                    self.queued -= 1
+
+        # Run in the caller's context so stage timings land in the request's access record
+        future = self.executor.submit(contextvars.copy_context().run, run)
+        future.add_done_callback(release_if_cancelled)
+        return asyncio.wrap_future(future)
+
+    def record_backend_time(self, backend: str, seconds: float):
+        """
+        Record how long the compiler itself ran for one job, so compile backends can be compared.
+        """
+        COMPILE_SECONDS.observe(seconds, backend)
+        with self._lock:
+            self.backend_times.setdefault(backend, deque(maxlen=1024)).append(seconds)
+
+    def stats(self):
+        """
+        Get queue depth, throughput counters and latency percentiles for monitoring.
+        """
+        with self._lock:
+            wait_times = list(self.wait_times)
+            compile_times = list(self.compile_times)
+            backend_times = {backend: list(times) for backend, times in self.backend_times.items()}
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "wait_p50": _percentile(wait_times, 50),
+                "wait_p95": _percentile(wait_times, 95),
+                "compile_p50": _percentile(compile_times, 50),
+                "compile_p95": _percentile(compile_times, 95),
+                "backends": {
+                    backend: {
+                        "count": len(times),
+                        "p50": _percentile(times, 50),
+                        "p95": _percentile(times, 95),
+                    }
+                    for backend, times in backend_times.items()
+                },
+            }
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop accepting work and wait for running compiles to finish.
+        """
+        self.executor.shutdown(wait=wait, cancel_futures=True)
@@ -1,19 +1,16 @@
-import os
 import google.generativeai as genai
-from dotenv import load_dotenv
 from utility_func import reduce_tokens
-
-load_dotenv()
+from generation_endpoints.gemini_client import configure_gemini, generate_content_async, stream_content_async
 
 class CoverLetterGenerator:
     def __init__(self):
         # Configure Gemini API
-        genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
+        configure_gemini()
         self.model = genai.GenerativeModel("gemini-2.5-flash-lite-preview-06-17")
 
-    def generate_cover_letter(self, request):
+    def build_prompt(self, request) -> str:
         """
-        Generate a cover letter using Gemini AI
+        Build the token-reduced cover letter prompt
         """
         prompt = f"""
 **Task:**  
@@ -69,9 +66,15 @@ Craft a professional cover letter using the provided job posting and candidate d
 
 **Now, write the cover letter following the above instructions.**"""
 
+        # Reduce tokens in the prompt
+        return reduce_tokens(prompt)
+
+    def generate_cover_letter(self, request):
+        """
+        Generate a cover letter using Gemini AI
+        """
         try:
-            # Reduce tokens in the prompt
-            prompt = reduce_tokens(prompt)
+            prompt = self.build_prompt(request)
             # Generate content using the model
             response = self.model.generate_content(prompt)
             
@@ -80,4 +83,37 @@ Craft a professional cover letter using the provided job posting and candidate d
                 "tokens_used": response.usage_metadata.total_token_count  # Add token tracking if possible
             }
         except Exception as e:
-            raise ValueError(f"Cover letter generation failed: {str(e)}")
\ No newline at end of file
+            raise ValueError(f"Cover letter generation failed: {str(e)}")
+
+    async def agenerate_cover_letter(self, request, timeout: float = None):
+        """
+        Generate a cover letter using Gemini AI without blocking the event loop
+        """
+        try:
+            prompt = self.build_prompt(request)
+            response = await generate_content_async(self.model, prompt, timeout=timeout)
+
+            return {
+                "cover_letter": response.text,
+                "tokens_used": response.usage_metadata.total_token_count
+            }
+        except TimeoutError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Cover letter generation failed: {str(e)}")
+
+    async def astream_cover_letter(self, request, timeout: float = None):
+        """
+        Stream a cover letter from Gemini AI as it is generated
+        Yields (text, tokens_used) pairs; tokens_used is the running total reported by Gemini, if any.
+        """
+        try:
+            prompt = self.build_prompt(request)
+            async for chunk in stream_content_async(self.model, prompt, timeout=timeout):
+                text = chunk.text if chunk.parts else ""
+                tokens_used = chunk.usage_metadata.total_token_count or None
+                yield text, tokens_used
+        except TimeoutError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Cover letter generation failed: {str(e)}")
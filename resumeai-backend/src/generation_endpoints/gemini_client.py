@@ -0,0 +1,110 @@
+# gemini_client.py
+import asyncio
+import os
+import weakref
+import google.generativeai as genai
+from dotenv import load_dotenv
+from request_log import timed
+
+load_dotenv()
+
+# Seconds allowed for a single Gemini call before it is abandoned
+GEMINI_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', 60))
+# Maximum Gemini calls in flight per worker process
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', 32))
+# "grpc" (SDK default) or "rest"; use "rest" with GEMINI_API_ENDPOINT to target a local fake server
+GEMINI_TRANSPORT = os.getenv('GEMINI_TRANSPORT')
+GEMINI_API_ENDPOINT = os.getenv('GEMINI_API_ENDPOINT')
+
+_configured = False
+# Concurrency cap per event loop, created on first use: an asyncio.Semaphore only works on one loop
+_upstream_slots_by_loop = weakref.WeakKeyDictionary()
+
+
+def _upstream_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    slots = _upstream_slots_by_loop.get(loop)
+    if slots is None:
+        slots = _upstream_slots_by_loop[loop] = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+    return slots
+
+
+def configure_gemini():
+    """
+    Configure the Gemini SDK once per process from environment variables.
+    """
+    global _configured
+    if _configured:
+        return
+    client_options = {"api_endpoint": GEMINI_API_ENDPOINT} if GEMINI_API_ENDPOINT else None
+    genai.configure(
+        api_key=os.getenv('GEMINI_API_KEY'),
+        transport=GEMINI_TRANSPORT,
+        client_options=client_options
+    )
+    _configured = True
+
+
+async def generate_content_async(model: genai.GenerativeModel, prompt: str, timeout: float = None,
+                                 generation_config: genai.GenerationConfig = None):
+    """
+    Run a Gemini generation without blocking the event loop.
+    Calls are capped at GEMINI_MAX_CONCURRENCY per process and raise TimeoutError after `timeout` seconds.
+    generation_config, if given, overrides the model's (e.g. to request JSON output).
+    """
+    timeout = GEMINI_TIMEOUT if timeout is None else timeout
+    request_options = {"timeout": timeout}
+    async with _upstream_slots():
+        if GEMINI_TRANSPORT == "rest":
+            # The SDK's async client only speaks gRPC, so REST calls run on a worker thread instead
+            call = asyncio.to_thread(
+                model.generate_content, prompt, generation_config=generation_config, request_options=request_options
+            )
+        else:
+            call = model.generate_content_async(
+                prompt, generation_config=generation_config, request_options=request_options
+            )
+        with timed("llm"):
+            return await asyncio.wait_for(call, timeout)
+
+
+async def stream_content_async(model: genai.GenerativeModel, prompt: str, timeout: float = None):
+    """
+    Stream a Gemini generation without blocking the event loop, yielding response chunks as they arrive.
+    Shares the concurrency cap with generate_content_async; `timeout` bounds the whole stream.
+    """
+    timeout = GEMINI_TIMEOUT if timeout is None else timeout
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    request_options = {"timeout": timeout}
+
+    def remaining():
+        return max(0.0, deadline - loop.time())
+
+    async with _upstream_slots():
+        # Timed until the stream ends, including waits for the client to take each chunk
+        with timed("llm"):
+            if GEMINI_TRANSPORT == "rest":
+                # Same as generate_content_async: iterate the sync REST stream on worker threads
+                iterator = await asyncio.wait_for(
+                    asyncio.to_thread(model.generate_content, prompt, stream=True, request_options=request_options),
+                    remaining()
+                )
+                iterator = iter(iterator)
+                while True:
+                    chunk = await asyncio.wait_for(asyncio.to_thread(next, iterator, None), remaining())
+                    if chunk is None:
+                        break
+                    yield chunk
+            else:
+                response = await asyncio.wait_for(
+                    model.generate_content_async(prompt, stream=True, request_options=request_options),
+                    remaining()
+                )
+                chunks = response.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), remaining())
+                    except StopAsyncIteration:
+                        break
+                    yield chunk
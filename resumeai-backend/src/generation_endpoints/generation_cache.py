@@ -0,0 +1,170 @@
+# generation_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+from utility_func import TTLCache, call_backend
+
+load_dotenv()
+
+
+class MemoryCacheBackend:
+    """
+    Per-process LRU store with expiry.
+    """
+
+    blocking = False
+
+    def __init__(self, maxsize: int = 1024):
+        self.entries = TTLCache(maxsize=maxsize)
+
+    def get(self, key: str):
+        return self.entries.get(key)
+
+    def set(self, key: str, value, ttl: float):
+        self.entries.set(key, value, ttl=ttl)
+
+
+class SQLiteCacheBackend:
+    """
+    On-disk store shared by every worker on the host and kept across restarts.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, maxsize: int = 100000):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS generation_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value FROM generation_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value, ttl: float):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO generation_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl)
+            )
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._prune()
+
+    def _prune(self):
+        """
+        Drop expired rows, then the soonest-to-expire rows beyond maxsize
+        """
+        self.conn.execute("DELETE FROM generation_cache WHERE expires_at <= ?", (time.time(),))
+        self.conn.execute(
+            "DELETE FROM generation_cache WHERE key IN ("
+            "SELECT key FROM generation_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.maxsize,)
+        )
+
+
+class GenerationCache:
+    """
+    Content-addressed cache of LLM generations.
+    Entries are keyed on the normalized request, the model name and the prompt template version,
+    so changing a prompt or model never serves stale output.
+    A cache without a backend is disabled: every lookup misses with a None key and stores are dropped.
+    """
+
+    def __init__(self, backend, ttl: float = 86400):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build the cache configured by GENERATION_CACHE_BACKEND ("memory" or "sqlite").
+        Returns None when caching is not enabled.
+        """
+        backend_name = os.getenv('GENERATION_CACHE_BACKEND', '').lower()
+        maxsize = int(os.getenv('GENERATION_CACHE_SIZE', 10000))
+        if backend_name == "memory":
+            backend = MemoryCacheBackend(maxsize=maxsize)
+        elif backend_name == "sqlite":
+            path = os.getenv('GENERATION_CACHE_PATH', 'Database/generation_cache.sqlite3')
+            backend = SQLiteCacheBackend(path, maxsize=maxsize)
+        else:
+            return None
+        return cls(backend, ttl=float(os.getenv('GENERATION_CACHE_TTL', 86400)))
+
+    @staticmethod
+    def make_key(request, model_name: str, prompt_version: str) -> str:
+        """
+        Hash the request with whitespace-normalized strings, ignoring the cache flag itself.
+        """
+        payload = {
+            name: " ".join(value.split()) if isinstance(value, str) else value
+            for name, value in request.model_dump(exclude={"cache"}).items()
+        }
+        canonical = json.dumps(
+            {"request": payload, "model": model_name, "prompt_version": prompt_version},
+            sort_keys=True, separators=(",", ":")
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def lookup(self, request, model_name: str, prompt_version: str):
+        """
+        Get (key, cached value). The value is None on a miss or when the request asks to bypass the cache.
+        """
+        if self.backend is None:
+            return None, None
+        key = self.make_key(request, model_name, prompt_version)
+        if getattr(request, "cache", "prefer") == "bypass":
+            return key, None
+        return key, self._count(self.backend.get(key))
+
+    async def alookup(self, request, model_name: str, prompt_version: str):
+        """
+        Like lookup, without blocking the event loop on the backend.
+        """
+        if self.backend is None:
+            return None, None
+        key = self.make_key(request, model_name, prompt_version)
+        if getattr(request, "cache", "prefer") == "bypass":
+            return key, None
+        return key, self._count(await call_backend(self.backend, self.backend.get, key))
+
+    def _count(self, value):
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def store(self, key: str, value):
+        """
+        Store a generation under the key lookup returned; a None key (caching disabled) is ignored.
+        """
+        if key is not None:
+            self.backend.set(key, value, self.ttl)
+
+    async def astore(self, key: str, value):
+        if key is not None:
+            await call_backend(self.backend, self.backend.set, key, value, self.ttl)
+
+    def stats(self):
+        """
+        Get hit/miss counters for monitoring.
+        """
+        return {"backend": type(self.backend).__name__, "hits": self.hits, "misses": self.misses}
@@ -1,15 +1,65 @@
 # project_description_generator.py
+import asyncio
+import json
+import logging
+import os
 import google.generativeai as genai
 from models import ProjectDescriptionRequest
 from utility_func import *
+from generation_endpoints.gemini_client import configure_gemini, generate_content_async, stream_content_async
+from generation_endpoints.generation_cache import GenerationCache
+
+# Bump whenever the prompt changes so cached generations from the old prompt are not reused
+PROMPT_VERSION = "1"
+
+# "packed" sends a whole batch as one prompt, "concurrent" one prompt per project in parallel
+PROJECT_BATCH_MODE = os.getenv('PROJECT_BATCH_MODE', 'packed').lower()
+# Gemini calls in flight per batch in concurrent mode (and when a packed reply is unusable)
+PROJECT_BATCH_CONCURRENCY = int(os.getenv('PROJECT_BATCH_CONCURRENCY', 4))
+
+# Writing rules and example shared by the single and the batch prompts
+INSTRUCTIONS = """
+    **Instructions:**
+    - Begin with a strong action verb.
+    - Emphasize the technologies and skills listed.
+    - **Include specific metrics or quantifiable results when possible** (e.g., percentages, numbers, time saved).
+    - Keep the sentence concise (around 30-50 words).
+    - Focus on your contributions and achievements.
+    - Highlight the project's complexity and scope.
+    - Incorporate relevant details from the additional context if provided.
+    - Do not start the sentence with bullet points, numbers, or symbols.
+    - don't use ordinal numbers in text form (first , second, etc.) use numerals (1st, 2nd, etc.)
+    - Use numerals for all numbers (e.g., "5 years", "40% improvement") - never spell out numbers
+    - Use achievement-focused language (delivered, implemented, spearheaded, orchestrated)
+    - Include quantifiable results
+    - Be specific and impactful
+    - Maintain professional tone
+    - Must include at least one measurable achievement
+
+    **Example:**
+    Developed a full-stack e-commerce platform using React and Firebase, integrated secure payment processing with Stripe, **increasing user transaction rates by 25%** and **improving page load times by 40%**.
+"""
+
+class UnusablePackedReply(ValueError):
+    """
+    A packed batch reply that cannot be split into descriptions. tokens_used is what the call cost anyway.
+    """
+
+    def __init__(self, message: str, tokens_used: int):
+        super().__init__(message)
+        self.tokens_used = tokens_used
+
 
 class ProjectDescriptionGenerator:
-    def __init__(self, model_name="gemini-2.5-flash-lite-preview-06-17"):
+    def __init__(self, model_name="gemini-2.5-flash-lite-preview-06-17", cache: GenerationCache = None):
+        configure_gemini()
+        self.model_name = model_name
         self.model = genai.GenerativeModel(model_name)
+        self.cache = cache if cache is not None else GenerationCache(None)
 
-    def generate_description(self, request: ProjectDescriptionRequest) -> str:
+    def build_prompt(self, request: ProjectDescriptionRequest) -> str:
         """
-        Generate a professional project description for a CV/resume.
+        Build the token-reduced project description prompt.
         """
         # Create base context from required fields
         context = f"""
@@ -28,33 +78,173 @@ class ProjectDescriptionGenerator:
         **Project Details:**
         {context}
 
-        **Instructions:**
-        - Begin with a strong action verb.
-        - Emphasize the technologies and skills listed.
-        - **Include specific metrics or quantifiable results when possible** (e.g., percentages, numbers, time saved).
-        - Keep the sentence concise (around 30-50 words).
-        - Focus on your contributions and achievements.
-        - Highlight the project's complexity and scope.
-        - Incorporate relevant details from the additional context if provided.
-        - Do not start the sentence with bullet points, numbers, or symbols.
-        - don't use ordinal numbers in text form (first , second, etc.) use numerals (1st, 2nd, etc.)
-        - Use numerals for all numbers (e.g., "5 years", "40% improvement") - never spell out numbers
-        - Use achievement-focused language (delivered, implemented, spearheaded, orchestrated)
-        - Include quantifiable results
-        - Be specific and impactful
-        - Maintain professional tone
-        - Must include at least one measurable achievement
-        
-        **Example:**
-        Developed a full-stack e-commerce platform using React and Firebase, integrated secure payment processing with Stripe, **increasing user transaction rates by 25%** and **improving page load times by 40%**.
+        {INSTRUCTIONS}
 
         **Now, write the sentence following the above instructions.**
         """
+        # Reduce tokens in the prompt
+        return reduce_tokens(prompt)
+
+    def build_batch_prompt(self, requests: list) -> str:
+        """
+        Build one token-reduced prompt asking for a JSON array with a description per project, in order.
+        The instructions are sent once for the whole batch.
+        """
+        projects = ""
+        for number, request in enumerate(requests, start=1):
+            projects += f"""
+        Project {number}:
+        Project Name: {request.project_name}
+        Technologies and Skills Used: {request.skills}
+        """
+            if request.project_description:
+                projects += f"\nAdditional Details: {request.project_description}"
+
+        prompt = f"""
+        **Task:**
+        Create a professional and impactful project description for a CV/resume for each of the following projects.
+
+        **Projects:**
+        {projects}
+
+        {INSTRUCTIONS}
+
+        **Now, write one description per project following the above instructions.**
+        Return a JSON array of exactly {len(requests)} strings, the description of Project 1 first.
+        """
+        return reduce_tokens(prompt)
+
+    def generate_description(self, request: ProjectDescriptionRequest) -> str:
+        """
+        Generate a professional project description for a CV/resume.
+        """
         try:
-            # Reduce tokens in the prompt
-            prompt = reduce_tokens(prompt)
+            key, cached = self.cache.lookup(request, self.model_name, PROMPT_VERSION)
+            if cached is not None:
+                return cached
+
+            prompt = self.build_prompt(request)
             # Generate content using the model
             response = self.model.generate_content(prompt)
-            return response.text.strip()
+            text = response.text.strip()
+            self.cache.store(key, text)
+            return text
+        except Exception as e:
+            raise ValueError(f"Error generating project description: {str(e)}")
+
+    async def agenerate_description(self, request: ProjectDescriptionRequest, timeout: float = None):
+        """
+        Generate a professional project description without blocking the event loop.
+        """
+        try:
+            key, cached = await self.cache.alookup(request, self.model_name, PROMPT_VERSION)
+            if cached is not None:
+                return {"project_description": cached, "tokens_used": 0, "cached": True}
+
+            prompt = self.build_prompt(request)
+            response = await generate_content_async(self.model, prompt, timeout=timeout)
+            text = response.text.strip()
+            await self.cache.astore(key, text)
+            return {
+                "project_description": text,
+                "tokens_used": response.usage_metadata.total_token_count,
+                "cached": False
+            }
+        except TimeoutError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Error generating project description: {str(e)}")
+
+    async def astream_description(self, request: ProjectDescriptionRequest, timeout: float = None):
+        """
+        Stream a professional project description as it is generated.
+        Yields (text, tokens_used) pairs; tokens_used is the running total reported by Gemini, if any,
+        and 0 when the text is served from the cache.
+        """
+        try:
+            key, cached = await self.cache.alookup(request, self.model_name, PROMPT_VERSION)
+            if cached is not None:
+                yield cached, 0
+                return
+
+            prompt = self.build_prompt(request)
+            parts = []
+            async for chunk in stream_content_async(self.model, prompt, timeout=timeout):
+                text = chunk.text if chunk.parts else ""
+                tokens_used = chunk.usage_metadata.total_token_count or None
+                parts.append(text)
+                yield text, tokens_used
+            await self.cache.astore(key, "".join(parts).strip())
+        except TimeoutError:
+            raise
         except Exception as e:
-            raise ValueError(f"Error generating project description: {str(e)}")
\ No newline at end of file
+            raise ValueError(f"Error generating project description: {str(e)}")
+
+    async def agenerate_descriptions(self, requests: list, timeout: float = None):
+        """
+        Generate descriptions for several projects at once, in request order.
+        Cached descriptions are reused; the rest are generated in one packed prompt, or concurrently
+        per project, as PROJECT_BATCH_MODE says. Returns (descriptions, tokens_used); tokens_used is 0
+        when every description came from the cache.
+        """
+        try:
+            descriptions = []
+            keys = []
+            for request in requests:
+                key, cached = await self.cache.alookup(request, self.model_name, PROMPT_VERSION)
+                keys.append(key)
+                descriptions.append(cached)
+            missing = [index for index, description in enumerate(descriptions) if description is None]
+            if not missing:
+                return descriptions, 0
+
+            pending = [requests[index] for index in missing]
+            generated = None
+            wasted_tokens = 0
+            if PROJECT_BATCH_MODE == "packed" and len(pending) > 1:
+                try:
+                    generated, tokens_used = await self._agenerate_packed(pending, timeout)
+                except ValueError as e:
+                    logging.getLogger("uvicorn").warning("Packed project description batch unusable, generating one by one: %s", e)
+                    # The failed packed call is still billed
+                    wasted_tokens = getattr(e, "tokens_used", 0)
+            if generated is None:
+                generated, tokens_used = await self._agenerate_concurrently(pending, timeout)
+                if wasted_tokens:
+                    tokens_used = (tokens_used or 0) + wasted_tokens
+
+            for index, text in zip(missing, generated):
+                descriptions[index] = text
+                await self.cache.astore(keys[index], text)
+            return descriptions, tokens_used
+        except TimeoutError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Error generating project descriptions: {str(e)}")
+
+    async def _agenerate_packed(self, requests: list, timeout: float = None):
+        prompt = self.build_batch_prompt(requests)
+        response = await generate_content_async(
+            self.model, prompt, timeout=timeout,
+            generation_config=genai.GenerationConfig(response_mime_type="application/json")
+        )
+        tokens_used = response.usage_metadata.total_token_count or None
+        try:
+            descriptions = json.loads(response.text)
+        except ValueError:  # Also raised by response.text when the reply has no text
+            raise UnusablePackedReply("reply is not JSON", tokens_used or 0)
+        if (not isinstance(descriptions, list) or len(descriptions) != len(requests)
+                or not all(isinstance(text, str) and text.strip() for text in descriptions)):
+            raise UnusablePackedReply(f"expected {len(requests)} descriptions", tokens_used or 0)
+        return [text.strip() for text in descriptions], tokens_used
+
+    async def _agenerate_concurrently(self, requests: list, timeout: float = None):
+        slots = asyncio.Semaphore(PROJECT_BATCH_CONCURRENCY)
+
+        async def generate(request):
+            async with slots:
+                return await generate_content_async(self.model, self.build_prompt(request), timeout=timeout)
+
+        responses = await asyncio.gather(*(generate(request) for request in requests))
+        tokens_used = sum(response.usage_metadata.total_token_count or 0 for response in responses) or None
+        return [response.text.strip() for response in responses], tokens_used
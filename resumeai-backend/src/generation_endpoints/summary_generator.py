@@ -2,14 +2,22 @@
 import google.generativeai as genai
 from models import SummaryRequest
 from utility_func import reduce_tokens
+from generation_endpoints.gemini_client import configure_gemini, generate_content_async, stream_content_async
+from generation_endpoints.generation_cache import GenerationCache
+
+# Bump whenever the prompt changes so cached generations from the old prompt are not reused
+PROMPT_VERSION = "1"
 
 class SummaryGenerator:
-    def __init__(self, model_name="gemini-2.5-flash-lite-preview-06-17"):
+    def __init__(self, model_name="gemini-2.5-flash-lite-preview-06-17", cache: GenerationCache = None):
+        configure_gemini()
+        self.model_name = model_name
         self.model = genai.GenerativeModel(model_name)
+        self.cache = cache if cache is not None else GenerationCache(None)
 
-    def generate_summary(self, request: SummaryRequest) -> str:
+    def build_prompt(self, request: SummaryRequest) -> str:
         """
-        Generate a professional summary for resume
+        Build the token-reduced summary prompt
         """
         prompt = f"""
 **Task:**  
@@ -43,11 +51,71 @@ Spearheaded complex software solutions as a Senior Software Engineer with 5+ yea
 **Now, write the summary following the above instructions.**
         """
 
+        # Reduce tokens in the prompt
+        return reduce_tokens(prompt)
+
+    def generate_summary(self, request: SummaryRequest) -> str:
+        """
+        Generate a professional summary for resume
+        """
         try:
-            # Reduce tokens in the prompt
-            prompt = reduce_tokens(prompt)
+            key, cached = self.cache.lookup(request, self.model_name, PROMPT_VERSION)
+            if cached is not None:
+                return cached
+
+            prompt = self.build_prompt(request)
             # Generate content using the model
             response = self.model.generate_content(prompt)
-            return response.text.strip()
+            text = response.text.strip()
+            self.cache.store(key, text)
+            return text
+        except Exception as e:
+            raise ValueError(f"Error generating summary: {str(e)}")
+
+    async def agenerate_summary(self, request: SummaryRequest, timeout: float = None):
+        """
+        Generate a professional summary for resume without blocking the event loop
+        """
+        try:
+            key, cached = await self.cache.alookup(request, self.model_name, PROMPT_VERSION)
+            if cached is not None:
+                return {"summary": cached, "tokens_used": 0, "cached": True}
+
+            prompt = self.build_prompt(request)
+            response = await generate_content_async(self.model, prompt, timeout=timeout)
+            text = response.text.strip()
+            await self.cache.astore(key, text)
+            return {
+                "summary": text,
+                "tokens_used": response.usage_metadata.total_token_count,
+                "cached": False
+            }
+        except TimeoutError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Error generating summary: {str(e)}")
+
+    async def astream_summary(self, request: SummaryRequest, timeout: float = None):
+        """
+        Stream a professional summary for resume as it is generated
+        Yields (text, tokens_used) pairs; tokens_used is the running total reported by Gemini, if any,
+        and 0 when the text is served from the cache.
+        """
+        try:
+            key, cached = await self.cache.alookup(request, self.model_name, PROMPT_VERSION)
+            if cached is not None:
+                yield cached, 0
+                return
+
+            prompt = self.build_prompt(request)
+            parts = []
+            async for chunk in stream_content_async(self.model, prompt, timeout=timeout):
+                text = chunk.text if chunk.parts else ""
+                tokens_used = chunk.usage_metadata.total_token_count or None
+                parts.append(text)
+                yield text, tokens_used
+            await self.cache.astore(key, "".join(parts).strip())
+        except TimeoutError:
+            raise
         except Exception as e:
-            raise ValueError(f"Error generating summary: {str(e)}")
\ No newline at end of file
+            raise ValueError(f"Error generating summary: {str(e)}")
@@ -0,0 +1,93 @@
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+
+class PrecompiledFormats:
+    """
+    Builds and caches a precompiled LaTeX format (.fmt) per template.
+
+    The format holds everything in the template's preamble up to \\endofdump (document class and
+    packages), dumped with mylatexformat, so a resume compiled with -fmt skips loading them.
+    Format files are named after a hash of the template and the engine version and kept on disk,
+    so they survive restarts and are rebuilt only when either changes.
+    """
+
+    def __init__(self, format_dir: str = None, engine: str = "pdflatex"):
+        self.format_dir = Path(format_dir or os.getenv('LATEX_FORMAT_DIR', 'latex_templates/formats')).absolute()
+        self.engine = engine
+        self._formats = {}  # template path -> format path, or None if the build failed
+        self._engine_version = None
+        self._lock = threading.Lock()
+
+    def engine_version(self) -> str:
+        if self._engine_version is None:
+            result = subprocess.run([self.engine, '--version'], check=True, capture_output=True, timeout=10)
+            self._engine_version = result.stdout.decode(errors='replace').splitlines()[0]
+        return self._engine_version
+
+    def format_name(self, template: Path) -> str:
+        digest = hashlib.sha256(template.read_bytes() + self.engine_version().encode()).hexdigest()
+        return f"{template.stem}-{digest[:12]}"
+
+    def get(self, template) -> Optional[Path]:
+        """
+        Get the format file for a template, building it on first use.
+        Returns None if the format cannot be built, in which case callers compile without it.
+        """
+        template = Path(template).absolute()
+        fmt = self._formats.get(template, False)
+        if fmt is not False:
+            return fmt
+
+        with self._lock:
+            if template not in self._formats:
+                try:
+                    self._formats[template] = self._build(template)
+                except (OSError, subprocess.SubprocessError) as e:
+                    logging.getLogger("uvicorn").error("Could not precompile LaTeX format for %s: %s", template.name, e)
+                    self._formats[template] = None
+            return self._formats[template]
+
+    def _build(self, template: Path) -> Path:
+        name = self.format_name(template)
+        fmt_path = self.format_dir / f"{name}.fmt"
+        if fmt_path.exists():
+            return fmt_path
+
+        self.format_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory() as build_dir:
+            subprocess.run([
+                self.engine,
+                '-ini',
+                '-interaction=nonstopmode',
+                '-halt-on-error',
+                f'-jobname={name}',
+                f'&{self.engine}',
+                'mylatexformat.ltx',
+                str(template)
+            ], cwd=build_dir, check=True, capture_output=True, timeout=120)
+
+            # Copy then rename so other workers never see a partially written format
+            partial_path = fmt_path.with_suffix(f".{os.getpid()}.tmp")
+            shutil.copyfile(Path(build_dir) / f"{name}.fmt", partial_path)
+            os.replace(partial_path, fmt_path)
+
+        logging.getLogger("uvicorn").info("Precompiled LaTeX format built: %s", fmt_path.name)
+        return fmt_path
+
+    def compile_env(self) -> dict:
+        """
+        Environment for engine runs using -fmt, with the format directory on the format search path.
+        """
+        # Trailing separator keeps the default search path after ours
+        return {**os.environ, "TEXFORMATS": f"{self.format_dir}{os.pathsep}"}
+
+
+precompiled_formats = PrecompiledFormats()
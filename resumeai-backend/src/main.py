@@ -1,7 +1,9 @@
 import os
+import asyncio
 import logging
-from fastapi import FastAPI, Depends, HTTPException, Security, Request
+from fastapi import FastAPI, Depends, HTTPException, Query, Security, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from fastapi.security import APIKeyHeader
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
@@ -14,32 +16,52 @@ from contextlib import asynccontextmanager
 from pathlib import Path
 import json
 import hashlib
+import functools
+import io
+import secrets
+import math
+import re
 import subprocess
+import time
+import zipfile
 # Local imports
 from models import *
 from api_key_manager import APIKeyManager
 from generation_endpoints.cover_letter_generator import CoverLetterGenerator
 from generation_endpoints.project_description_generator import ProjectDescriptionGenerator
 from generation_endpoints.summary_generator import SummaryGenerator
-from resume_creator import ResumeTexGenerator
-from Auth_DataBase.auth_database import AuthDatabase
+from generation_endpoints.generation_cache import GenerationCache
+from resume_creator import ResumeTexGenerator, DEFAULT_TEMPLATE, get_template, template_path
+from compile_service import LatexCompileService, CompileQueueFull
+from latex_format import precompiled_formats
+from render_cache import RenderCache
+from resume_jobs import ResumeJobQueue, ResumeJobQueueFull
+from usage_meter import UsageMeter
+from quota import COMPLETION_TOKEN_ESTIMATES, QuotaEngine, QuotaExceeded, estimate_tokens, resume_cost
+from utility_func import ZipStream, format_sse
+from Auth_DataBase.async_auth_database import AsyncAuthDatabase
+from request_log import AccessLogMiddleware, LogWriter, add_timing, timed
+from metrics import REGISTRY, stats_samples
+from profiling import ProfilingMiddleware
 
 # Load environment variables
 load_dotenv()
 output_dir = Path("logs")
 output_dir.mkdir(exist_ok=True)
 
-# Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address)
+# Initialize rate limiter; RATE_LIMIT_ENABLED=false turns the per-IP limits off, e.g. for load tests from one machine
+limiter = Limiter(
+    key_func=get_remote_address,
+    enabled=os.getenv('RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+)
 
-# Configure logging
-LOG_FILENAME = datetime.datetime.now().strftime('logs/logfile_%Y_%m_%d.log')
-logging.basicConfig(level=logging.INFO, filename=LOG_FILENAME)
-logger = logging.getLogger("uvicorn")
+# /metrics requires "Authorization: Bearer <METRICS_TOKEN>" and is not served at all without one
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
 
-handler_file = logging.FileHandler(LOG_FILENAME)
-handler_file.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
-logger.addHandler(handler_file)
+# Configure logging: JSON lines in logs/logfile_%Y_%m_%d.log, written by a background thread
+log_writer = LogWriter("logs")
+log_writer.start()
+logger = logging.getLogger("uvicorn")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -47,39 +69,60 @@ async def lifespan(app: FastAPI):
     Initialize logging for the lifespan of the application
     """
 
-    # Update IP address for dynamic DNS
-    try:
-        response = requests.get(f"http://api-ipv4.dynu.com/nic/update?hostname=resumeai.webredirect.org&password={os.getenv('DYNU_PASS')}")
-        logger.info(f"IP address updated: {response.text}")
-    except Exception as e:
-        logger.error(f"Error updating IP address: {str(e)}")
+    # Update IP address for dynamic DNS; skipped without DYNU_PASS (local runs, load tests)
+    dynamic_dns = bool(os.getenv('DYNU_PASS'))
+    if dynamic_dns:
+        try:
+            response = requests.get(f"http://api-ipv4.dynu.com/nic/update?hostname=resumeai.webredirect.org&password={os.getenv('DYNU_PASS')}")
+            logger.info("IP address updated: %s", response.text)
+        except Exception as e:
+            logger.error("Error updating IP address: %s", e)
         
     # Limiter setup
     
     app.state.limiter = limiter
     app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+    # Create any missing tables (users, API keys, usage records)
+    await auth_db.init_models()
+
+    # Parse the resume template once up front, and build its precompiled LaTeX format
+    # in the background so the first resume doesn't pay for either
+    await asyncio.to_thread(get_template, DEFAULT_TEMPLATE)
+    compile_service.submit(precompiled_formats.get, DEFAULT_TEMPLATE)
+    resume_jobs.start()
+    usage_meter.start()
+
     yield
-    try:
-        logoff_ip = requests.get(f"http://api.dynu.com/nic/update?hostname=resumeai.webredirect.org&password={os.getenv('DYNU_PASS')}&offline=yes")
-        logger.info(f"IP address logged off: {logoff_ip.text}")
-    except Exception as e:
-        logger.error(f"Error logging off IP address: {str(e)}")
+    if dynamic_dns:
+        try:
+            logoff_ip = requests.get(f"http://api.dynu.com/nic/update?hostname=resumeai.webredirect.org&password={os.getenv('DYNU_PASS')}&offline=yes")
+            logger.info("IP address logged off: %s", logoff_ip.text)
+        except Exception as e:
+            logger.error("Error logging off IP address: %s", e)
         
+    await resume_jobs.stop()
+    compile_service.shutdown()
+    await usage_meter.stop()
+    await auth_db.close_all_connections()
     logger.info("Shutting down...")
-    logger.removeHandler(handler_file)
-    handler_file.close()
+    log_writer.stop()
     
 # create log folder if not existed
 if not os.path.exists('logs'):
     os.makedirs('logs')
 
 # Initialize components
-api_key_manager = APIKeyManager(logger=logger)
-auth_db = AuthDatabase()
+auth_db = AsyncAuthDatabase()
+api_key_manager = APIKeyManager(logger=logger, async_auth_db=auth_db)
+usage_meter = UsageMeter(auth_db)
+quota_engine = QuotaEngine.from_env()  # None when QUOTA_TOKENS_PER_MINUTE is 0
 cover_letter_generator = CoverLetterGenerator()
-project_description_generator = ProjectDescriptionGenerator()
-summary_generator = SummaryGenerator()
+compile_service = LatexCompileService()
+generation_cache = GenerationCache.from_env()  # None unless GENERATION_CACHE_BACKEND is set
+project_description_generator = ProjectDescriptionGenerator(cache=generation_cache)
+summary_generator = SummaryGenerator(cache=generation_cache)
+render_cache = RenderCache.from_env()  # None when RENDER_CACHE_MAX_BYTES is 0
 
 # Define API Key security scheme
 api_key_header = APIKeyHeader(
@@ -88,17 +131,311 @@ api_key_header = APIKeyHeader(
 )
 
 # Security dependency function
-async def check_api_key(api_key: str = Security(api_key_header)) -> str:
+async def get_principal(request: Request, api_key: str = Security(api_key_header)) -> Principal:
+    """
+    Validate the API key and resolve its owner once per request.
+    The resulting Principal is also attached to request.state.principal.
+    """
+    with timed("auth"):
+        principal = await api_key_manager.authenticate(api_key)
+    request.state.principal = principal
+    return principal
+
+async def require_quota(principal: Principal, cost: int) -> int:
     """
-    Validate API key using Security
+    Charge cost tokens to the caller's API key before any work starts, rejecting with 429 if the
+    key's quota cannot cover it. Returns the amount charged.
     """
-    if not await api_key_manager.validate_api_key(api_key):
+    if quota_engine is None:
+        return 0
+    try:
+        await quota_engine.acharge(principal.api_key, cost)
+    except QuotaExceeded as e:
+        logger.warning("Quota exceeded for user %s: charge of %s tokens", principal.username, cost)
+        if e.retry_after is None:
+            # Retrying cannot help, so this is not a 429
+            raise HTTPException(
+                status_code=413,
+                detail=f"Request needs {cost} tokens, more than the {quota_engine.burst:.0f} your quota allows at once"
+            )
         raise HTTPException(
-            status_code=401,
-            detail="Invalid or missing API key",
-            headers={"WWW-Authenticate": "ApiKey"},
+            status_code=429,
+            detail="Token quota exceeded, please try again later",
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
         )
-    return api_key
+    return cost
+
+async def settle_quota(principal: Principal, charged: int, tokens_used: int = None):
+    """
+    Replace the up-front estimate with the tokens actually used, once known; failed requests settle at 0
+    """
+    if quota_engine is not None and charged:
+        await quota_engine.asettle(principal.api_key, charged, tokens_used)
+
+async def generation_event_stream(chunks, response_model, field: str, label: str, principal: Principal, endpoint: str,
+                                  charged: int = 0):
+    """
+    Forward streamed Gemini chunks as server-sent events.
+    Each chunk is sent as {"text": ...}; a final "done" event carries the full response model
+    including tokens_used, and failures after the stream has started are sent as an "error" event.
+    Completed streams are metered against the principal, and its quota charge settled; streams the
+    client abandons are metered and settled for what was streamed until then.
+    """
+    username = principal.username
+    start = time.perf_counter()
+    parts = []
+    tokens_used = None
+    settled = False
+    try:
+        async for text, tokens in chunks:
+            if tokens is not None:
+                tokens_used = tokens
+            if text:
+                parts.append(text)
+                yield format_sse(json.dumps({"text": text}))
+
+        result = response_model(**{field: "".join(parts).strip(), "tokens_used": tokens_used})
+        # Cached generations are reported as using 0 tokens
+        usage_meter.record(principal.user_id, endpoint, tokens_used, time.perf_counter() - start, cache_hit=tokens_used == 0)
+        settled = True
+        await settle_quota(principal, charged, tokens_used)
+        yield format_sse(result.model_dump_json(), event="done")
+    except TimeoutError:
+        logger.error("Timed out streaming %s for user: %s", label, username)
+        settled = True
+        await settle_quota(principal, charged, 0)
+        yield format_sse(json.dumps({"detail": "Content generation timed out, please try again"}), event="error")
+    except Exception as e:
+        logger.error("Error streaming %s: %s", label, e)
+        settled = True
+        await settle_quota(principal, charged, 0)
+        yield format_sse(json.dumps({"detail": f"Error generating {label}: {str(e)}"}), event="error")
+    finally:
+        if not settled:
+            # The client disconnected (GeneratorExit or cancellation): bill the running total Gemini
+            # reported, or estimate it from the text streamed so far
+            cache_hit = tokens_used == 0
+            if tokens_used is None:
+                tokens_used = estimate_tokens("".join(parts)) if parts else 0
+            logger.info("Client left the %s stream of user %s after %s tokens", label, username, tokens_used)
+            usage_meter.record(principal.user_id, endpoint, tokens_used, time.perf_counter() - start, cache_hit=cache_hit)
+            # The task is being cancelled; shield the settlement so it is not interrupted halfway
+            await asyncio.shield(settle_quota(principal, charged, tokens_used))
+
+def event_stream_response(events) -> StreamingResponse:
+    """
+    Wrap an SSE generator in a response that proxies will not buffer
+    """
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def resume_cache_key(request_dict: dict, template: Path = DEFAULT_TEMPLATE):
+    """
+    Key for the rendered resume in the render cache, or None when the cache is disabled
+    """
+    if render_cache is None:
+        return None
+    return render_cache.make_key(request_dict, get_template(template).digest)
+
+async def render_resume_tex(request_dict: dict, cache_key: str = None, template: Path = DEFAULT_TEMPLATE) -> str:
+    """
+    Get the resume's LaTeX source from the render cache, filling the template on a miss.
+    Cache files are read and written on a worker thread, off the event loop.
+    """
+    if cache_key:
+        cached = await asyncio.to_thread(render_cache.get, cache_key, "tex")
+        if cached is not None:
+            return cached.decode()
+
+    tex_content = ResumeTexGenerator(request=request_dict, template=template).generate_tex()
+    if cache_key:
+        await asyncio.to_thread(render_cache.put, cache_key, "tex", tex_content.encode())
+    return tex_content
+
+async def render_resume_pdf(request_dict: dict, cache_key: str = None, template: Path = DEFAULT_TEMPLATE):
+    """
+    Get the resume's PDF from the render cache, compiling it on a compile worker on a miss.
+    Returns (pdf bytes, whether it was compiled).
+    """
+    if cache_key:
+        cached = await asyncio.to_thread(render_cache.get, cache_key, "pdf")
+        if cached is not None:
+            return cached, False
+
+    resume_generator = ResumeTexGenerator(request=request_dict, template=template)
+    pdf_content = await compile_service.submit(resume_generator.build_pdf)
+    compile_service.record_backend_time(resume_generator.compile_backend, resume_generator.compile_seconds)
+    add_timing("compile", resume_generator.compile_seconds)
+    logger.info("PDF compiled with %s in %.0fms", resume_generator.compile_backend, resume_generator.compile_seconds * 1000)
+    if cache_key:
+        await asyncio.to_thread(render_cache.put, cache_key, "pdf", pdf_content)
+    return pdf_content, True
+
+def render_cost(output_format: str, compiled: bool) -> int:
+    """
+    Quota cost of a render once done: PDFs served from the render cache cost no compile
+    """
+    return resume_cost(output_format if compiled else "tex")
+
+async def render_resume(request_dict: dict, template: Path = DEFAULT_TEMPLATE):
+    """
+    Render the artifacts the request's output_format asks for, as (tex_file, pdf_file, quota cost)
+    """
+    cache_key = resume_cache_key(request_dict, template)
+    output_format = request_dict["output_format"]
+    tex_file = await render_resume_tex(request_dict, cache_key, template) if output_format in ("tex", "both") else None
+    pdf_file, compiled = None, False
+    if output_format in ("pdf", "both"):
+        pdf_file, compiled = await render_resume_pdf(request_dict, cache_key, template)
+    return tex_file, pdf_file, render_cost(output_format, compiled)
+
+async def render_resume_batch(items: list, principal: Principal, charged: int = 0):
+    """
+    Render (index, template id, request dict) items concurrently, yielding a BatchResumeResult
+    for each as it finishes. At most one compile per compile worker is in flight, so a batch
+    keeps the compile pool busy without filling its queue. Once the batch ends, or the client
+    leaves, the quota charge is settled at the cost of the items rendered.
+    """
+    username = principal.username
+    slots = asyncio.Semaphore(compile_service.workers)
+    spent = 0
+
+    async def render_item(index: int, template_id: str, request_dict: dict) -> BatchResumeResult:
+        nonlocal spent
+        async with slots:
+            while True:
+                try:
+                    tex_file, pdf_file, cost = await render_resume(request_dict, template_path(template_id))
+                    spent += cost
+                    return BatchResumeResult(index=index, template=template_id, tex_file=tex_file, pdf_file=pdf_file)
+                except CompileQueueFull:
+                    await asyncio.sleep(1)
+                except subprocess.CalledProcessError as e:
+                    logger.error("LaTeX compilation failed for user %s (batch item %s): %s", username, index, e.stderr.decode(errors='replace'))
+                    return BatchResumeResult(index=index, template=template_id, error="PDF compilation failed")
+                except Exception as e:
+                    logger.error("Error generating resume for user %s (batch item %s): %s", username, index, e)
+                    return BatchResumeResult(index=index, template=template_id, error="Error generating resume")
+
+    tasks = [asyncio.create_task(render_item(*item)) for item in items]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        # The client went away or the stream failed; stop rendering what is left
+        for task in tasks:
+            task.cancel()
+        # Failed and unfinished items are refunded; shielded in case the stream is being cancelled
+        await asyncio.shield(settle_quota(principal, charged, spent))
+
+async def batch_ndjson(results):
+    async for result in results:
+        yield result.model_dump_json() + "\n"
+
+async def batch_zip(results):
+    """
+    Stream the batch as a zip: <index>-<template>.tex/.pdf per resume, <index>-<template>.error.txt on failure
+    """
+    archive = ZipStream()
+    async for result in results:
+        prefix = f"{result.index:04d}-{result.template}"
+        if result.error:
+            yield archive.add(f"{prefix}.error.txt", result.error)
+            continue
+        if result.tex_file is not None:
+            yield archive.add(f"{prefix}.tex", result.tex_file)
+        if result.pdf_file is not None:
+            # PDF streams are already compressed
+            yield archive.add(f"{prefix}.pdf", result.pdf_file, compress_type=zipfile.ZIP_STORED)
+    yield archive.close()
+
+resume_jobs = ResumeJobQueue(render_resume)
+
+@REGISTRY.collector
+def service_metrics():
+    """
+    Read the services' own stats at scrape time
+    """
+    try:
+        yield from stats_samples("resumeai_db_pool", auth_db.get_pool_status(), "Auth database connection pool")
+    except AttributeError:
+        pass  # Pools without a fixed size, such as SQLite's, cannot report these
+    yield from stats_samples("resumeai_compile", compile_service.stats(), "LaTeX compile service",
+                             counters=("completed", "failed", "rejected"))
+    yield from stats_samples("resumeai_resume_jobs", resume_jobs.stats(), "Resume job queue",
+                             counters=("done", "failed"))
+    yield from stats_samples("resumeai_api_key_cache", api_key_manager.cache_stats(), "API key cache",
+                             counters=("hits", "misses"))
+    if generation_cache is not None:
+        yield from stats_samples("resumeai_generation_cache", generation_cache.stats(), "Generation cache",
+                                 counters=("hits", "misses"))
+    if render_cache is not None:
+        yield from stats_samples("resumeai_render_cache", render_cache.stats(), "Rendered resume cache",
+                                 counters=("hits", "misses", "evictions"))
+    yield from stats_samples("resumeai_usage_meter", usage_meter.stats(), "Usage meter",
+                             counters=("recorded", "written", "dropped", "failed_flushes"))
+    if quota_engine is not None:
+        yield from stats_samples("resumeai_quota", quota_engine.stats(), "Token quotas",
+                                 counters=("allowed", "rejected"))
+
+def resume_job_response(request: Request, job) -> ResumeJobResponse:
+    # Paths built from the request include the root_path the app is served under behind the proxy
+    status_url = request.url_for("get_resume_job", job_id=job.job_id).path
+    return ResumeJobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        output_format=job.request_dict["output_format"],
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        error=job.error,
+        status_url=status_url,
+        result_url=request.url_for("get_resume_job_result", job_id=job.job_id).path if job.status == "done" else None
+    )
+
+# Media type a client lists in Accept to download each output format as a file instead of JSON
+RESUME_MEDIA_TYPES = {"tex": "application/x-tex", "pdf": "application/pdf", "both": "application/zip"}
+
+def accepts(request: Request, media_type: str) -> bool:
+    """
+    Check whether the Accept header explicitly lists media_type (wildcards do not count)
+    """
+    accept = request.headers.get("accept", "")
+    return any(part.split(";")[0].strip().lower() == media_type for part in accept.split(","))
+
+def resume_response(request: Request, request_dict: dict, pdf_file: bytes = None, tex_file: str = None):
+    """
+    Return the resume as a file download when the client accepts its media type, otherwise as a
+    CreateResumeResponse with the PDF base64-encoded. "both" downloads as a zip of the tex and PDF.
+    """
+    output_format = request_dict["output_format"]
+    media_type = RESUME_MEDIA_TYPES[output_format]
+    if not accepts(request, media_type):
+        # Serialized here rather than by FastAPI, which would validate the model again first
+        with timed("serialize"):
+            content = CreateResumeResponse(pdf_file=pdf_file, tex_file=tex_file).model_dump_json()
+        return Response(content=content, media_type="application/json")
+
+    name = re.sub(r'[^A-Za-z0-9_-]', '', request_dict["information"].get("name", "")) or "resume"
+    if output_format == "pdf":
+        filename, content = f"{name}.pdf", pdf_file
+    elif output_format == "tex":
+        filename, content = f"{name}.tex", tex_file.encode()
+    else:
+        buffer = io.BytesIO()
+        with timed("serialize"), zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr(f"{name}.tex", tex_file, compress_type=zipfile.ZIP_DEFLATED)
+            # PDF streams are already compressed
+            archive.writestr(f"{name}.pdf", pdf_file, compress_type=zipfile.ZIP_STORED)
+        filename, content = f"{name}.zip", buffer.getvalue()
+
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 # Create FastAPI app
 app = FastAPI(
@@ -134,6 +471,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Profiles requests sent with X-Profile: <PROFILE_TOKEN> and a PROFILE_SAMPLE_RATE sample of the rest
+app.add_middleware(ProfilingMiddleware)
+
+# Added last so it wraps everything else and times the whole request
+app.add_middleware(AccessLogMiddleware)
+
 # Authentication endpoints
 @app.post("/auth/register", tags=["Authentication"], response_model=RegisterUserResponse)
 @limiter.limit("3/minute")
@@ -143,7 +486,7 @@ async def register_user(request: Request, user_data: RegisterUserRequest):
     """
     try:
         # Check for existing user
-        if auth_db.get_user_by_username(user_data.username):
+        if await auth_db.get_user_by_username(user_data.username):
             raise HTTPException(
                 status_code=409,
                 detail="Username already exists"
@@ -153,12 +496,12 @@ async def register_user(request: Request, user_data: RegisterUserRequest):
         password_hash = hashlib.sha256(user_data.password.encode()).hexdigest()
         
         # Create user
-        user_id = auth_db.create_user(user_data.username, password_hash)
+        user_id = await auth_db.create_user(user_data.username, password_hash)
         
         # Generate API key for the user
-        api_key = api_key_manager.generate_new_api_key(user_id)
+        api_key = await api_key_manager.agenerate_new_api_key(user_id)
         
-        logger.info(f"New user registered: {user_data.username} with ID: {user_id}")
+        logger.info("New user registered: %s with ID: %s", user_data.username, user_id)
         
         return {
             "message": "User registered successfully",
@@ -167,7 +510,7 @@ async def register_user(request: Request, user_data: RegisterUserRequest):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Registration failed for {user_data.username}: {str(e)}")
+        logger.error("Registration failed for %s: %s", user_data.username, e)
         raise HTTPException(
             status_code=400,
             detail=f"Registration failed: {str(e)}"
@@ -184,7 +527,7 @@ async def generate_api_key(request: Request, user_data: GenerateAPIKeyRequest):
         password_hash = hashlib.sha256(user_data.password.encode()).hexdigest()
         
         # Find user by username
-        user = auth_db.get_user_by_username(user_data.username)
+        user = await auth_db.get_user_by_username(user_data.username)
         
         if not user or user['password_hash'] != password_hash:
             raise HTTPException(
@@ -193,9 +536,9 @@ async def generate_api_key(request: Request, user_data: GenerateAPIKeyRequest):
             )
         
         # Generate new API key
-        api_key = api_key_manager.generate_new_api_key(user['id'])
+        api_key = await api_key_manager.agenerate_new_api_key(user['id'])
         
-        logger.info(f"New API key generated for user: {user_data.username}")
+        logger.info("New API key generated for user: %s", user_data.username)
         
         return {
             "message": "API key generated successfully",
@@ -204,7 +547,7 @@ async def generate_api_key(request: Request, user_data: GenerateAPIKeyRequest):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"API key generation failed for {user_data.username}: {str(e)}")
+        logger.error("API key generation failed for %s: %s", user_data.username, e)
         raise HTTPException(
             status_code=500,
             detail=f"API key generation failed: {str(e)}"
@@ -212,21 +555,17 @@ async def generate_api_key(request: Request, user_data: GenerateAPIKeyRequest):
 
 @app.get("/auth/my-api-keys", tags=["Authentication"], response_model=GetAPIKeysResponse)
 @limiter.limit("3/minute")
-async def get_my_api_keys(request: Request, api_key: str = Security(check_api_key)):
+async def get_my_api_keys(request: Request, principal: Principal = Security(get_principal)):
     """
     Get all API keys for the authenticated user
     
     Requires valid API key in X-API-Key header.
     """
     try:
-        user = api_key_manager.get_user_from_api_key(api_key)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        api_keys = auth_db.get_user_api_keys(user['id'])
+        api_keys = await auth_db.get_user_api_keys(principal.user_id) or []
         
         return {
-            "username": user['username'],
+            "username": principal.username,
             "api_keys": [
                 {
                     "id": str(key['id']),
@@ -239,36 +578,78 @@ async def get_my_api_keys(request: Request, api_key: str = Security(check_api_ke
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting API keys: {str(e)}")
+        logger.error("Error getting API keys: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error retrieving API keys: {str(e)}"
         )
 
+@app.get("/auth/my-usage", tags=["Authentication"], response_model=UsageResponse)
+@limiter.limit("10/minute")
+async def get_my_usage(
+    request: Request,
+    days: int = Query(30, ge=1, le=365, description="How many days back to report"),
+    principal: Principal = Security(get_principal)
+):
+    """
+    Get the authenticated user's content generation usage per endpoint
+    
+    Requires valid API key in X-API-Key header.
+    """
+    try:
+        # Include requests still waiting in the meter's buffer
+        await usage_meter.flush()
+        since = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days)
+        endpoints = await auth_db.get_usage_summary(principal.user_id, since)
+        return {
+            "username": principal.username,
+            "since": since,
+            "total_tokens": sum(endpoint["tokens_used"] for endpoint in endpoints),
+            "endpoints": endpoints
+        }
+    except Exception as e:
+        logger.error("Error getting usage: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error retrieving usage: {str(e)}"
+        )
+
 # Protected endpoints
 @app.post("/generate-cover-letter", 
           response_model=CoverLetterResponse,
           tags=["Content Generation"])
-@limiter.limit("5/minute")
 async def generate_cover_letter(
     request: Request,
     user_data: CoverLetterRequest,
-    api_key: str = Security(check_api_key)
+    principal: Principal = Security(get_principal)
 ):
     """
     Generate a personalized cover letter
     
     Requires valid API key in X-API-Key header.
     """
+    charged = await require_quota(principal, estimate_tokens(
+        cover_letter_generator.build_prompt(user_data), COMPLETION_TOKEN_ESTIMATES["cover_letter"]
+    ))
     try:
         # Log API usage
-        user = api_key_manager.get_user_from_api_key(api_key)
-        logger.info(f"Cover letter generation requested by user: {user['username'] if user else 'Unknown'}")
+        logger.info("Cover letter generation requested by user: %s", principal.username)
         
-        result = cover_letter_generator.generate_cover_letter(user_data)
+        start = time.perf_counter()
+        result = await cover_letter_generator.agenerate_cover_letter(user_data)
+        usage_meter.record(principal.user_id, "/generate-cover-letter", result["tokens_used"], time.perf_counter() - start)
+        await settle_quota(principal, charged, result["tokens_used"])
         return result
+    except TimeoutError:
+        logger.error("Timed out generating cover letter for user: %s", principal.username)
+        await settle_quota(principal, charged, 0)
+        raise HTTPException(
+            status_code=504,
+            detail="Content generation timed out, please try again"
+        )
     except Exception as e:
-        logger.error(f"Error generating cover letter: {str(e)}")
+        logger.error("Error generating cover letter: %s", e)
+        await settle_quota(principal, charged, 0)
         raise HTTPException(
             status_code=500,
             detail=f"Error generating cover letter: {str(e)}"
@@ -277,118 +658,262 @@ async def generate_cover_letter(
 @app.post("/generate-project-description", 
           response_model=ProjectDescriptionResponse,
           tags=["Content Generation"])
-@limiter.limit("5/minute")
 async def generate_project_description(
     request: Request,
     user_data: ProjectDescriptionRequest,
-    api_key: str = Security(check_api_key)
+    principal: Principal = Security(get_principal)
 ):
     """
     Generate a professional project description for CV
     
     Requires valid API key in X-API-Key header.
     """
+    charged = await require_quota(principal, estimate_tokens(
+        project_description_generator.build_prompt(user_data), COMPLETION_TOKEN_ESTIMATES["project_description"]
+    ))
     try:
         # Log API usage
-        user = api_key_manager.get_user_from_api_key(api_key)
-        logger.info(f"Project description generation requested by user: {user['username'] if user else 'Unknown'}")
+        logger.info("Project description generation requested by user: %s", principal.username)
         
-        description = project_description_generator.generate_description(user_data)
-        return {"project_description": description}
+        start = time.perf_counter()
+        result = await project_description_generator.agenerate_description(user_data)
+        usage_meter.record(
+            principal.user_id, "/generate-project-description", result["tokens_used"],
+            time.perf_counter() - start, cache_hit=result["cached"]
+        )
+        await settle_quota(principal, charged, result["tokens_used"])
+        return result
+    except TimeoutError:
+        logger.error("Timed out generating project description for user: %s", principal.username)
+        await settle_quota(principal, charged, 0)
+        raise HTTPException(
+            status_code=504,
+            detail="Content generation timed out, please try again"
+        )
     except Exception as e:
-        logger.error(f"Error generating project description: {str(e)}")
+        logger.error("Error generating project description: %s", e)
+        await settle_quota(principal, charged, 0)
         raise HTTPException(
             status_code=500,
             detail=f"Error generating project description: {str(e)}"
         )
 
+@app.post("/generate-project-description/batch", 
+          response_model=ProjectDescriptionBatchResponse,
+          tags=["Content Generation"])
+async def generate_project_descriptions(
+    request: Request,
+    user_data: ProjectDescriptionBatchRequest,
+    principal: Principal = Security(get_principal)
+):
+    """
+    Generate professional descriptions for all of a resume's projects in one call
+    
+    Requires valid API key in X-API-Key header.
+    """
+    # Charged as if each project were generated on its own; settled to the real count afterwards
+    charged = await require_quota(principal, sum(
+        estimate_tokens(project_description_generator.build_prompt(project), COMPLETION_TOKEN_ESTIMATES["project_description"])
+        for project in user_data.projects
+    ))
+    try:
+        # Log API usage
+        logger.info("Project description batch of %s requested by user: %s", len(user_data.projects), principal.username)
+        
+        start = time.perf_counter()
+        descriptions, tokens_used = await project_description_generator.agenerate_descriptions(user_data.projects)
+        usage_meter.record(
+            principal.user_id, "/generate-project-description/batch", tokens_used,
+            time.perf_counter() - start, cache_hit=tokens_used == 0
+        )
+        await settle_quota(principal, charged, tokens_used)
+        return {"project_descriptions": descriptions, "tokens_used": tokens_used}
+    except TimeoutError:
+        logger.error("Timed out generating project descriptions for user: %s", principal.username)
+        await settle_quota(principal, charged, 0)
+        raise HTTPException(
+            status_code=504,
+            detail="Content generation timed out, please try again"
+        )
+    except Exception as e:
+        logger.error("Error generating project descriptions: %s", e)
+        await settle_quota(principal, charged, 0)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error generating project descriptions: {str(e)}"
+        )
+
 @app.post("/generate-summary", 
           response_model=SummaryResponse,
           tags=["Content Generation"])
-@limiter.limit("5/minute")
 async def generate_summary(
     request: Request,
     user_data: SummaryRequest,
-    api_key: str = Security(check_api_key)
+    principal: Principal = Security(get_principal)
 ):
     """
     Generate a professional summary for resume
     
     Requires valid API key in X-API-Key header.
     """
+    charged = await require_quota(principal, estimate_tokens(
+        summary_generator.build_prompt(user_data), COMPLETION_TOKEN_ESTIMATES["summary"]
+    ))
     try:
         # Log API usage
-        user = api_key_manager.get_user_from_api_key(api_key)
-        logger.info(f"Summary generation requested by user: {user['username'] if user else 'Unknown'}")
+        logger.info("Summary generation requested by user: %s", principal.username)
         
-        summary = summary_generator.generate_summary(user_data)
-        return {"summary": summary}
+        start = time.perf_counter()
+        result = await summary_generator.agenerate_summary(user_data)
+        usage_meter.record(
+            principal.user_id, "/generate-summary", result["tokens_used"],
+            time.perf_counter() - start, cache_hit=result["cached"]
+        )
+        await settle_quota(principal, charged, result["tokens_used"])
+        return result
+    except TimeoutError:
+        logger.error("Timed out generating summary for user: %s", principal.username)
+        await settle_quota(principal, charged, 0)
+        raise HTTPException(
+            status_code=504,
+            detail="Content generation timed out, please try again"
+        )
     except Exception as e:
-        logger.error(f"Error generating summary: {str(e)}")
+        logger.error("Error generating summary: %s", e)
+        await settle_quota(principal, charged, 0)
         raise HTTPException(
             status_code=500,
             detail=f"Error generating summary: {str(e)}"
         )
 
+@app.post("/generate-cover-letter/stream", tags=["Content Generation"])
+async def stream_cover_letter(
+    request: Request,
+    user_data: CoverLetterRequest,
+    principal: Principal = Security(get_principal)
+):
+    """
+    Stream a personalized cover letter as server-sent events
+    
+    Requires valid API key in X-API-Key header.
+    """
+    logger.info("Cover letter streaming requested by user: %s", principal.username)
+    charged = await require_quota(principal, estimate_tokens(
+        cover_letter_generator.build_prompt(user_data), COMPLETION_TOKEN_ESTIMATES["cover_letter"]
+    ))
+    chunks = cover_letter_generator.astream_cover_letter(user_data)
+    return event_stream_response(
+        generation_event_stream(chunks, CoverLetterResponse, "cover_letter", "cover letter", principal, "/generate-cover-letter/stream",
+                                charged=charged)
+    )
+
+@app.post("/generate-project-description/stream", tags=["Content Generation"])
+async def stream_project_description(
+    request: Request,
+    user_data: ProjectDescriptionRequest,
+    principal: Principal = Security(get_principal)
+):
+    """
+    Stream a professional project description for CV as server-sent events
+    
+    Requires valid API key in X-API-Key header.
+    """
+    logger.info("Project description streaming requested by user: %s", principal.username)
+    charged = await require_quota(principal, estimate_tokens(
+        project_description_generator.build_prompt(user_data), COMPLETION_TOKEN_ESTIMATES["project_description"]
+    ))
+    chunks = project_description_generator.astream_description(user_data)
+    return event_stream_response(
+        generation_event_stream(chunks, ProjectDescriptionResponse, "project_description", "project description", principal, "/generate-project-description/stream",
+                                charged=charged)
+    )
+
+@app.post("/generate-summary/stream", tags=["Content Generation"])
+async def stream_summary(
+    request: Request,
+    user_data: SummaryRequest,
+    principal: Principal = Security(get_principal)
+):
+    """
+    Stream a professional summary for resume as server-sent events
+    
+    Requires valid API key in X-API-Key header.
+    """
+    logger.info("Summary streaming requested by user: %s", principal.username)
+    charged = await require_quota(principal, estimate_tokens(
+        summary_generator.build_prompt(user_data), COMPLETION_TOKEN_ESTIMATES["summary"]
+    ))
+    chunks = summary_generator.astream_summary(user_data)
+    return event_stream_response(
+        generation_event_stream(chunks, SummaryResponse, "summary", "summary", principal, "/generate-summary/stream",
+                                charged=charged)
+    )
+
 @app.post("/create-resume", 
          response_model=CreateResumeResponse,
+         responses={200: {"content": {media_type: {} for media_type in RESUME_MEDIA_TYPES.values()}}},
          tags=["Content Generation"])
-@limiter.limit("5/minute")
 async def create_resume(
     request: Request,
     user_data: CreateResumeRequest,
-    api_key: str = Security(check_api_key)
+    principal: Principal = Security(get_principal)
 ):
     """
     Generate a complete resume using LaTeX
     
     Requires valid API key in X-API-Key header.
+    Responds with JSON (PDF base64-encoded) by default. To download the file directly, send
+    Accept: application/pdf, application/x-tex or application/zip (for output_format "both").
     """
+    charged = await require_quota(principal, resume_cost(user_data.output_format))
     try:
         # Log API usage
-        user = api_key_manager.get_user_from_api_key(api_key)
-        logger.info(f"Resume creation requested by user: {user['username'] if user else 'Unknown'} for output format: {user_data.output_format}")
+        logger.info("Resume creation requested by user: %s for output format: %s", principal.username, user_data.output_format)
         
         request_dict = json.loads(user_data.model_dump_json())
-        logger.debug(f"Request information dump: {request_dict}")
+        logger.debug("Request information dump: %s", request_dict)
         
-        resume_generator = ResumeTexGenerator(request=request_dict)
+        cache_key = resume_cache_key(request_dict)
         if request_dict['output_format'] == "tex":
-            tex_content = resume_generator.generate_tex()
-            logger.info(f"Tex generated successfully for user {api_key_manager.get_user_from_api_key(api_key)['username']}")
+            tex_content = await render_resume_tex(request_dict, cache_key)
+            logger.info("Tex generated successfully for user %s", principal.username)
                 
-            return CreateResumeResponse(pdf_file=None, tex_file=tex_content)
+            return resume_response(request, request_dict, tex_file=tex_content)
             
         elif request_dict['output_format'] == "pdf":            
             try:
-                pdf_path = resume_generator.generate_pdf()
-                pdf_content = pdf_path.read_bytes()
-                resume_generator.cleanup()  # Clean up temporary files
+                pdf_content, compiled = await render_resume_pdf(request_dict, cache_key)
+                if not compiled:
+                    # Served from the render cache, so the compile is refunded; failures past here refund the rest
+                    await settle_quota(principal, charged, render_cost("pdf", compiled))
+                    charged = render_cost("pdf", compiled)
                 
-                logger.info(f"PDF generated successfully for user {api_key_manager.get_user_from_api_key(api_key)['username']}")
+                logger.info("PDF generated successfully for user %s", principal.username)
 
-                return CreateResumeResponse(pdf_file=pdf_content, tex_file=None)
+                return resume_response(request, request_dict, pdf_file=pdf_content)
             
             except subprocess.CalledProcessError as e:
-                logger.error(f"LaTeX compilation failed for user {api_key_manager.get_user_from_api_key(api_key)['username']}: {e.stderr.decode()}")
+                logger.error("LaTeX compilation failed for user %s: %s", principal.username, e.stderr.decode())
                 raise HTTPException(
                     status_code=500,
                     detail=f"PDF compilation failed"
                 )
         elif request_dict['output_format'] == "both":
-            tex_content = resume_generator.generate_tex()
+            tex_content = await render_resume_tex(request_dict, cache_key)
 
             # Compile PDF 
             try:
-                pdf_path = resume_generator.generate_pdf()
-                pdf_content = pdf_path.read_bytes()
-                resume_generator.cleanup()  # Clean up temporary files
-                logger.info(f"PDF & Tex generated successfully for user {api_key_manager.get_user_from_api_key(api_key)['username']}")
-                return CreateResumeResponse(pdf_file=pdf_content, tex_file=tex_content)
+                pdf_content, compiled = await render_resume_pdf(request_dict, cache_key)
+                if not compiled:
+                    # Served from the render cache, so the compile is refunded; failures past here refund the rest
+                    await settle_quota(principal, charged, render_cost("both", compiled))
+                    charged = render_cost("both", compiled)
+                logger.info("PDF & Tex generated successfully for user %s", principal.username)
+                return resume_response(request, request_dict, pdf_file=pdf_content, tex_file=tex_content)
 
                     
             except subprocess.CalledProcessError as e:
-                logger.error(f"LaTeX compilation failed for user {api_key_manager.get_user_from_api_key(api_key)['username']}: {e.stderr.decode()}")
+                logger.error("LaTeX compilation failed for user %s: %s", principal.username, e.stderr.decode())
                 
                 raise HTTPException(
                     status_code=500,
@@ -401,15 +926,151 @@ async def create_resume(
             )
         
     except HTTPException:
+        await settle_quota(principal, charged, 0)
         raise
+    except CompileQueueFull:
+        logger.warning("Resume compile queue full, rejecting request from user %s", principal.username)
+        await settle_quota(principal, charged, 0)
+        raise HTTPException(
+            status_code=503,
+            detail="Resume compiler is busy, please try again shortly",
+            headers={"Retry-After": "5"}
+        )
     except Exception as e:
-        logger.error(f"Error generating resume for user {api_key_manager.get_user_from_api_key(api_key)['username']}: {str(e)}")
+        logger.error("Error generating resume for user %s: %s", principal.username, e)
+        await settle_quota(principal, charged, 0)
         # resume_generator.cleanup()  # Ensure cleanup on error
         raise HTTPException(
             status_code=500,
             detail=f"Error generating resume\nPlease report this issue to the developers."
         )
 
+@app.post("/create-resume/jobs",
+          response_model=ResumeJobResponse,
+          status_code=202,
+          tags=["Content Generation"])
+async def submit_resume_job(
+    request: Request,
+    user_data: CreateResumeRequest,
+    principal: Principal = Security(get_principal)
+):
+    """
+    Queue a resume for rendering and return its job at once.
+    Poll status_url until the job is done, then fetch the resume from result_url.
+    
+    Requires valid API key in X-API-Key header.
+    """
+    charged = await require_quota(principal, resume_cost(user_data.output_format))
+    request_dict = json.loads(user_data.model_dump_json())
+    try:
+        job = await resume_jobs.submit(request_dict, principal.user_id,
+                                       settle=functools.partial(settle_quota, principal, charged))
+    except ResumeJobQueueFull:
+        await settle_quota(principal, charged, 0)
+        logger.warning("Resume job queue full, rejecting job from user %s", principal.username)
+        raise HTTPException(
+            status_code=503,
+            detail="Too many resumes queued, please try again shortly",
+            headers={"Retry-After": "5"}
+        )
+    logger.info("Resume job %s queued by user: %s for output format: %s", job.job_id, principal.username, user_data.output_format)
+    return resume_job_response(request, job)
+
+@app.get("/create-resume/jobs/{job_id}",
+         response_model=ResumeJobResponse,
+         tags=["Content Generation"])
+@limiter.limit("60/minute")
+async def get_resume_job(
+    request: Request,
+    job_id: str,
+    wait: float = Query(0, ge=0, le=30, description="Seconds to wait for the job to finish before answering"),
+    principal: Principal = Security(get_principal)
+):
+    """
+    Get a resume job's status, optionally long-polling until it finishes.
+    
+    Requires valid API key in X-API-Key header.
+    """
+    job = await resume_jobs.get(job_id, principal.user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if wait:
+        job = await resume_jobs.wait(job, wait)
+    return resume_job_response(request, job)
+
+@app.get("/create-resume/jobs/{job_id}/result",
+         response_model=CreateResumeResponse,
+         responses={200: {"content": {media_type: {} for media_type in RESUME_MEDIA_TYPES.values()}}},
+         tags=["Content Generation"])
+@limiter.limit("30/minute")
+async def get_resume_job_result(
+    request: Request,
+    job_id: str,
+    principal: Principal = Security(get_principal)
+):
+    """
+    Fetch the resume rendered by a finished job, as JSON or as a file download (see /create-resume).
+    
+    Requires valid API key in X-API-Key header.
+    """
+    job = await resume_jobs.get(job_id, principal.user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=job.error or f"Job is {job.status}")
+    job = await resume_jobs.load_result(job)
+    return resume_response(request, job.request_dict, pdf_file=job.pdf_file, tex_file=job.tex_file)
+
+@app.post("/create-resume/batch",
+          responses={200: {"content": {"application/x-ndjson": {}, "application/zip": {}}}},
+          tags=["Content Generation"])
+async def create_resume_batch(
+    request: Request,
+    batch: BatchCreateResumeRequest,
+    principal: Principal = Security(get_principal)
+):
+    """
+    Render many resumes, or every resume with several templates, in one call.
+    
+    Results are streamed back as they finish, in completion order: by default as NDJSON, one
+    BatchResumeResult per line (PDFs base64-encoded); with Accept: application/zip as a zip archive.
+    
+    Requires valid API key in X-API-Key header.
+    """
+    template_ids = list(dict.fromkeys(batch.templates or [DEFAULT_TEMPLATE.stem]))
+    for template_id in template_ids:
+        try:
+            template_path(template_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    items = [
+        (index, template_id, json.loads(resume.model_dump_json()))
+        for index, resume in enumerate(batch.resumes)
+        for template_id in template_ids
+    ]
+    cost = sum(resume_cost(request_dict["output_format"]) for _, _, request_dict in items)
+    if quota_engine is not None and cost > quota_engine.burst:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                f"Batch of {len(items)} renders needs {cost} tokens, more than the {quota_engine.burst:.0f} your quota "
+                f"allows at once: split it into batches of at most {int(quota_engine.burst // resume_cost('pdf'))} "
+                f"pdf or {int(quota_engine.burst // resume_cost('tex'))} tex renders"
+            )
+        )
+    charged = await require_quota(principal, cost)
+    logger.info("Resume batch of %s renders requested by user: %s", len(items), principal.username)
+    results = render_resume_batch(items, principal, charged)
+
+    if accepts(request, "application/zip"):
+        return StreamingResponse(
+            batch_zip(results),
+            media_type="application/zip",
+            headers={"Content-Disposition": 'attachment; filename="resumes.zip"'}
+        )
+    return StreamingResponse(batch_ndjson(results), media_type="application/x-ndjson")
+
 # Public endpoints
 @app.get("/health", tags=["Health"])
 @limiter.limit("6/minute")
@@ -419,6 +1080,20 @@ def health_check(request: Request):
     """
     return {"status": "healthy"}
 
+@app.get("/metrics", response_class=Response, include_in_schema=False)
+async def metrics(request: Request):
+    """
+    Prometheus metrics for this worker process: stage and request latency histograms, token
+    counters, DB pool, compile queue, job queue, cache, usage meter and quota stats.
+    Operational data, so only scrapers holding METRICS_TOKEN get it; without a token configured
+    the endpoint does not exist.
+    """
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(request.headers.get("authorization", ""), f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/", tags=["Info"])
 @limiter.limit("6/minute")
 def root(request: Request):
@@ -429,8 +1104,11 @@ def root(request: Request):
         "message": "Resume Flow API",
         "version": "4.0.0",
         "endpoints": {
-            "auth": ["/auth/register", "/auth/generate-api-key", "/auth/my-api-keys"],
+            "auth": ["/auth/register", "/auth/generate-api-key", "/auth/my-api-keys", "/auth/my-usage"],
             "protected": ["/generate-cover-letter", "/generate-project-description", "/generate-summary", "/create-resume"],
+            "batch": ["/generate-project-description/batch", "/create-resume/batch"],
+            "jobs": ["/create-resume/jobs", "/create-resume/jobs/{job_id}", "/create-resume/jobs/{job_id}/result"],
+            "streaming": ["/generate-cover-letter/stream", "/generate-project-description/stream", "/generate-summary/stream"],
             "public": ["/health", "/"]
         }
     }
@@ -0,0 +1,173 @@
+import bisect
+import math
+import threading
+
+# Upper bounds (seconds) for latency histograms, from sub-millisecond escaping to minute-long LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Counter:
+    """
+    Monotonic count per label set.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in values.items():
+            yield self.name, dict(zip(self.labelnames, labels)), value
+
+
+class Histogram:
+    """
+    Bucketed distribution per label set. Observing is a bisect and two additions under a lock.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [per-bucket counts (last is +Inf), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self):
+        with self._lock:
+            series = {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+        for labels, (counts, total) in series.items():
+            labels = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class MetricsRegistry:
+    """
+    In-process metrics rendered in the Prometheus text exposition format.
+
+    Counters and histograms are updated as work happens. Values that services already track in
+    their own stats() are read by collectors at scrape time instead, so they cost nothing until
+    scraped. Every worker process has its own registry.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, collect):
+        """
+        Register collect(), called at scrape time, returning (name, kind, help, labels, value) tuples.
+        """
+        self._collectors.append(collect)
+        return collect
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        families = {}  # name -> (kind, help, samples), in first-seen order
+        for collect in self._collectors:
+            for name, kind, help, labels, value in collect():
+                if value is None:
+                    continue
+                families.setdefault(name, (kind, help, []))[2].append((labels, value))
+        for name, (kind, help, samples) in families.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def stats_samples(prefix: str, stats: dict, help: str, counters: tuple = (), labels: dict = None):
+    """
+    Turn a service's stats() dict into collector samples: numeric values become <prefix>_<key>
+    gauges, or <prefix>_<key>_total counters for the keys listed in counters. Other values are skipped.
+    """
+    for key, value in stats.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        if key in counters:
+            yield f"{prefix}_{key}_total", "counter", f"{help}: {key}", labels or {}, value
+        else:
+            yield f"{prefix}_{key}", "gauge", f"{help}: {key}", labels or {}, value
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "resumeai_stage_duration_seconds", "Time spent per processing stage", ("stage",)
+)
+COMPILE_SECONDS = REGISTRY.histogram(
+    "resumeai_compile_seconds", "LaTeX compiler wall time by compile backend", ("backend",)
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "resumeai_request_duration_seconds", "HTTP request duration until the response is fully sent", ("method", "endpoint")
+)
+REQUESTS = REGISTRY.counter(
+    "resumeai_requests_total", "HTTP requests by endpoint and status", ("method", "endpoint", "status")
+)
+LLM_TOKENS = REGISTRY.counter(
+    "resumeai_llm_tokens_total", "LLM tokens used by generation endpoint (cached results count 0)", ("endpoint",)
+)
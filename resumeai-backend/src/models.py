@@ -1,6 +1,7 @@
 from pydantic import ConfigDict, BaseModel, Field, field_serializer
-from typing import Optional
+from typing import Literal, Optional
 import base64
+import datetime
 
 class CoverLetterRequest(BaseModel):
     job_post: str = Field(
@@ -50,13 +51,33 @@ class ProjectDescriptionRequest(BaseModel):
         description="Additional description of the project (optional)",
         examples=["Built a website for an online store. Users can browse products, add to cart, and checkout."]
     )
+    cache: Literal["bypass", "prefer"] = Field(
+        "prefer",
+        description="'prefer' reuses an identical earlier generation when caching is enabled, 'bypass' always generates fresh output"
+    )
 
 class ProjectDescriptionResponse(BaseModel):
     project_description: str = Field(
         ...,
         description="Generated professional project description for CV"
     )
+    tokens_used: Optional[int] = None
     
+class ProjectDescriptionBatchRequest(BaseModel):
+    projects: list[ProjectDescriptionRequest] = Field(
+        ...,
+        description="Projects to describe",
+        min_length=1,
+        max_length=10
+    )
+
+class ProjectDescriptionBatchResponse(BaseModel):
+    project_descriptions: list[str] = Field(
+        ...,
+        description="Generated descriptions, in the same order as the requested projects"
+    )
+    tokens_used: Optional[int] = None
+
 class SummaryRequest(BaseModel):
     current_title: str = Field(
         ..., 
@@ -78,12 +99,17 @@ class SummaryRequest(BaseModel):
         description="Notable achievements or impacts (optional)",
         examples=["Led team of 5, Reduced system latency by 40%"]
     )
+    cache: Literal["bypass", "prefer"] = Field(
+        "prefer",
+        description="'prefer' reuses an identical earlier generation when caching is enabled, 'bypass' always generates fresh output"
+    )
 
 class SummaryResponse(BaseModel):
     summary: str = Field(
         ...,
         description="Generated professional summary for resume"
     )
+    tokens_used: Optional[int] = None
     
 class CreateResumeRequest(BaseModel):
     information: dict[str, str] = Field(
@@ -240,3 +266,63 @@ class GetAPIKeysResponse(BaseModel):
         }]]
     )
 
+class EndpointUsage(BaseModel):
+    endpoint: str = Field(..., description="Endpoint path", examples=["/generate-summary"])
+    requests: int = Field(..., description="Successful requests")
+    tokens_used: int = Field(..., description="Gemini tokens spent")
+    cache_hits: int = Field(..., description="Requests served from the generation cache")
+    avg_latency_ms: float = Field(..., description="Average time to produce the content, in milliseconds")
+
+class UsageResponse(BaseModel):
+    username: str = Field(..., description="Username the usage belongs to", examples=["johndoe"])
+    since: datetime.datetime = Field(..., description="Start of the reported period")
+    total_tokens: int = Field(..., description="Gemini tokens spent across all endpoints")
+    endpoints: list[EndpointUsage] = Field(..., description="Usage per endpoint")
+
+
+class Principal(BaseModel):
+    """
+    Authenticated caller resolved once per request from the X-API-Key header.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    user_id: int = Field(..., description="ID of the user owning the API key")
+    username: str = Field(..., description="Username of the user owning the API key")
+    api_key: str = Field(..., description="API key used for the request", repr=False)
+
+class ResumeJobResponse(BaseModel):
+    job_id: str = Field(..., description="ID of the resume job")
+    status: Literal["queued", "running", "done", "failed"] = Field(
+        ...,
+        description="Job status; artifacts can be fetched from result_url once it is done",
+        examples=["queued"]
+    )
+    output_format: str = Field(..., description="Requested output format", examples=["pdf"])
+    created_at: datetime.datetime = Field(..., description="When the job was submitted")
+    finished_at: Optional[datetime.datetime] = Field(None, description="When the job finished")
+    error: Optional[str] = Field(None, description="Why the job failed")
+    status_url: str = Field(..., description="Where to poll the job status")
+    result_url: Optional[str] = Field(None, description="Where to fetch the rendered resume once done")
+
+class BatchCreateResumeRequest(BaseModel):
+    resumes: list[CreateResumeRequest] = Field(
+        ...,
+        description=(
+            "Resumes to render, each in its own output_format. All renders (resumes x templates) are "
+            "charged to the token quota together and must fit in what it allows at once"
+        ),
+        min_length=1,
+        max_length=30
+    )
+    templates: Optional[list[str]] = Field(
+        None,
+        description="Template ids to render every resume with; defaults to the standard template",
+        examples=[["1"]],
+        min_length=1,
+        max_length=10
+    )
+
+class BatchResumeResult(CreateResumeResponse):
+    index: int = Field(..., description="Position of the resume in the batch request")
+    template: str = Field(..., description="Template id the resume was rendered with")
+    error: Optional[str] = Field(None, description="Why rendering failed; no files are included then")
@@ -0,0 +1,169 @@
+import asyncio
+import cProfile
+import collections
+import datetime
+import logging
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PROFILE_MODES = ("sample", "cprofile")
+
+# Besides the event loop, the threads request work runs on: LaTeX compile workers and asyncio.to_thread workers
+SAMPLED_THREAD_PREFIXES = ("latex-compile", "asyncio_")
+
+# Innermost frames of threads that are waiting for work; such samples are dropped
+IDLE_FRAMES = {
+    ("selectors.py", "select"),   # event loop waiting for I/O
+    ("thread.py", "_worker"),     # thread pool worker waiting for a job
+}
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of the event loop thread and the worker threads every `interval`
+    seconds from a background thread, counting them as collapsed stacks ("thread;outer;...;inner
+    count" lines), the input format of flamegraph.pl and speedscope. Idle threads are skipped.
+    """
+
+    def __init__(self, interval: float, loop_ident: int):
+        self.interval = interval
+        self.loop_ident = loop_ident
+        self.counts = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        # A busy thread only hands over the GIL every switch interval (5ms by default), which
+        # would cap the sampling rate; shorten it while sampling
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                name = names.get(ident, "")
+                if ident != self.loop_ident and not name.startswith(SAMPLED_THREAD_PREFIXES):
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}")
+                    frame = frame.f_back
+                stack.append("event-loop" if ident == self.loop_ident else name)
+                self.counts[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles requests sent with `X-Profile: <PROFILE_TOKEN>`, plus a random
+    PROFILE_SAMPLE_RATE fraction of all requests, and saves each profile under logs/profiles/ as
+    <time>-<endpoint>-<request body bytes>B-<id>.collapsed (or .pstats).
+
+    Mode "sample" (PROFILE_MODE, or per request with X-Profile-Mode) samples stacks on the event
+    loop and on the compile and to_thread workers, so work handed off to threads shows up too. Mode "cprofile" traces every call on the
+    event loop thread and writes pstats. Both see whatever else the process is doing meanwhile, so
+    only one request is profiled at a time. Profiled responses carry the profile id in X-Profile-Id.
+    """
+
+    def __init__(self, app, profile_dir: str = "logs/profiles"):
+        self.app = app
+        self.profile_dir = Path(profile_dir)
+        self.token = os.getenv('PROFILE_TOKEN')
+        self.sample_rate = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+        self.mode = os.getenv('PROFILE_MODE', 'sample').lower()
+        if self.mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown PROFILE_MODE: {self.mode}")
+        self.interval = float(os.getenv('PROFILE_INTERVAL', 0.005))
+        self.logger = logging.getLogger("uvicorn")
+        self._active = False
+
+    def requested_mode(self, scope):
+        """
+        The profiler mode to run for this request, or None to leave it unprofiled.
+        """
+        if self._active:
+            return None
+        headers = dict(scope["headers"])
+        token = headers.get(b"x-profile")
+        if token is not None and self.token and secrets.compare_digest(token, self.token.encode()):
+            mode = headers.get(b"x-profile-mode", b"").decode("latin-1").lower()
+            return mode if mode in PROFILE_MODES else self.mode
+        if self.sample_rate and random.random() < self.sample_rate:
+            return self.mode
+        return None
+
+    async def __call__(self, scope, receive, send):
+        mode = self.requested_mode(scope) if scope["type"] == "http" else None
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        profile_id = secrets.token_hex(4)
+        body_bytes = 0
+
+        async def counting_receive():
+            nonlocal body_bytes
+            message = await receive()
+            body_bytes += len(message.get("body", b""))
+            return message
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        if mode == "sample":
+            profiler = StackSampler(self.interval, threading.get_ident())
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        started = datetime.datetime.now()
+        try:
+            await self.app(scope, counting_receive, send_with_id)
+        finally:
+            if mode == "sample":
+                profiler.stop()
+            else:
+                profiler.disable()
+            self._active = False
+            endpoint = getattr(scope.get("route"), "path", None) or scope["path"]
+            slug = re.sub(r'[^A-Za-z0-9]+', '-', endpoint).strip('-') or "root"
+            path = self.profile_dir / (
+                f"{started:%Y%m%d-%H%M%S}-{slug}-{body_bytes}B-{profile_id}"
+                f".{'collapsed' if mode == 'sample' else 'pstats'}"
+            )
+            try:
+                await asyncio.to_thread(self._save, profiler, path)
+                self.logger.info("Profile of %s %s (%s request bytes) saved to %s", scope["method"], endpoint, body_bytes, path)
+            except OSError as e:
+                self.logger.error("Could not save profile %s: %s", path, e)
+
+    def _save(self, profiler, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(profiler, StackSampler):
+            path.write_text(profiler.collapsed())
+        else:
+            profiler.dump_stats(path)
@@ -0,0 +1,244 @@
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+from utility_func import TTLCache, call_backend
+
+load_dotenv()
+
+# Expected completion length per generation, added to the prompt's estimate when charging up front
+COMPLETION_TOKEN_ESTIMATES = {
+    "cover_letter": 800,
+    "summary": 200,
+    "project_description": 120,
+}
+
+# Cost of rendering a resume, in the same token units: filling the template is cheap, compiling is not
+RESUME_TEX_COST = int(os.getenv('QUOTA_RESUME_TEX_COST', 50))
+RESUME_COMPILE_COST = int(os.getenv('QUOTA_RESUME_COMPILE_COST', 1000))
+
+
+def resume_cost(output_format: str) -> int:
+    """
+    Quota charge for rendering one resume in the given output format.
+    """
+    return RESUME_TEX_COST + (RESUME_COMPILE_COST if output_format in ("pdf", "both") else 0)
+
+
+def estimate_tokens(prompt: str, completion_tokens: int = 0) -> int:
+    """
+    Rough token count for a prompt (about 4 characters per token) plus the expected completion.
+    """
+    return math.ceil(len(prompt) / 4) + completion_tokens
+
+
+class QuotaExceeded(Exception):
+    """
+    Raised when a charge does not fit in the caller's bucket.
+    retry_after is how many seconds until it would fit, or None if it never can.
+    """
+
+    def __init__(self, cost: float, retry_after: float = None):
+        super().__init__(f"Quota exceeded for a charge of {cost:.0f} tokens")
+        self.cost = cost
+        self.retry_after = retry_after
+
+
+def _refill(level: float, updated_at: float, now: float, rate: float, burst: float) -> float:
+    return min(burst, level + max(0.0, now - updated_at) * rate)
+
+
+class MemoryQuotaBackend:
+    """
+    Per-process buckets. An idle bucket refills completely, so buckets untouched for longer than
+    that are simply forgotten.
+    """
+
+    blocking = False
+
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        self.buckets = None
+        self._lock = threading.Lock()
+
+    def configure(self, rate: float, burst: float):
+        self.buckets = TTLCache(maxsize=self.maxsize, ttl=burst / rate)
+
+    def take(self, key: str, cost: float, rate: float, burst: float, now: float):
+        """
+        Refill the bucket and take cost from it if it fits. Returns (taken, level after).
+        """
+        with self._lock:
+            level, updated_at = self.buckets.get(key, (burst, now))
+            level = _refill(level, updated_at, now, rate, burst)
+            taken = cost <= level
+            if taken:
+                level -= cost
+            self.buckets.set(key, (level, now))
+            return taken, level
+
+    def give(self, key: str, amount: float, rate: float, burst: float, now: float):
+        """
+        Add amount back to the bucket (a negative amount takes more, down to a debt).
+        """
+        with self._lock:
+            level, updated_at = self.buckets.get(key, (burst, now))
+            level = min(burst, _refill(level, updated_at, now, rate, burst) + amount)
+            self.buckets.set(key, (level, now))
+
+
+class SQLiteQuotaBackend:
+    """
+    Buckets in a SQLite file shared by every worker process on the host.
+    """
+
+    # Updates can wait up to the connection timeout for another worker's write lock
+    blocking = True
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS quota_buckets ("
+            "key TEXT PRIMARY KEY, level REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def configure(self, rate: float, burst: float):
+        pass
+
+    def _update(self, key: str, now: float, burst: float, change):
+        # BEGIN IMMEDIATE takes the write lock up front so concurrent workers serialize on the bucket
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    "SELECT level, updated_at FROM quota_buckets WHERE key = ?", (key,)
+                ).fetchone()
+                level, result = change(*(row or (burst, now)))
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO quota_buckets (key, level, updated_at) VALUES (?, ?, ?)",
+                    (key, level, now)
+                )
+                self.conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def take(self, key: str, cost: float, rate: float, burst: float, now: float):
+        def change(level, updated_at):
+            level = _refill(level, updated_at, now, rate, burst)
+            taken = cost <= level
+            if taken:
+                level -= cost
+            return level, (taken, level)
+        return self._update(key, now, burst, change)
+
+    def give(self, key: str, amount: float, rate: float, burst: float, now: float):
+        def change(level, updated_at):
+            return min(burst, _refill(level, updated_at, now, rate, burst) + amount), None
+        self._update(key, now, burst, change)
+
+
+class QuotaEngine:
+    """
+    Token-bucket quotas per API key, measured in LLM tokens.
+
+    Each key's bucket holds up to `burst` tokens and refills at `tokens_per_minute`. Requests are
+    charged their estimated cost before any work starts and rejected if it does not fit; once the
+    real token count is known the difference is settled, so cheap requests are not billed like
+    expensive ones.
+    """
+
+    def __init__(self, backend, tokens_per_minute: float, burst: float):
+        self.backend = backend
+        self.rate = tokens_per_minute / 60
+        self.burst = burst
+        self.backend.configure(self.rate, self.burst)
+        self.allowed = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build the engine configured by QUOTA_TOKENS_PER_MINUTE, QUOTA_BURST and QUOTA_BACKEND
+        ("memory" or "sqlite"). Returns None when QUOTA_TOKENS_PER_MINUTE is 0.
+        """
+        tokens_per_minute = float(os.getenv('QUOTA_TOKENS_PER_MINUTE', 20000))
+        if tokens_per_minute <= 0:
+            return None
+        burst = float(os.getenv('QUOTA_BURST', tokens_per_minute * 2))
+        if os.getenv('QUOTA_BACKEND', 'memory').lower() == "sqlite":
+            backend = SQLiteQuotaBackend(os.getenv('QUOTA_PATH', 'Database/quota.sqlite3'))
+        else:
+            backend = MemoryQuotaBackend()
+        return cls(backend, tokens_per_minute, burst)
+
+    @staticmethod
+    def bucket_key(api_key: str) -> str:
+        # Buckets are keyed on a hash so API keys are never stored
+        return hashlib.sha256(api_key.encode()).hexdigest()
+
+    def charge(self, api_key: str, cost: float):
+        """
+        Take cost tokens from the key's bucket, or raise QuotaExceeded without taking anything.
+        """
+        self._check_burst(cost)
+        self._record(cost, *self.backend.take(self.bucket_key(api_key), cost, self.rate, self.burst, time.time()))
+
+    async def acharge(self, api_key: str, cost: float):
+        """
+        Like charge, without blocking the event loop on the backend.
+        """
+        self._check_burst(cost)
+        taken, level = await call_backend(
+            self.backend, self.backend.take, self.bucket_key(api_key), cost, self.rate, self.burst, time.time()
+        )
+        self._record(cost, taken, level)
+
+    def _check_burst(self, cost: float):
+        if cost > self.burst:
+            self.rejected += 1
+            raise QuotaExceeded(cost)
+
+    def _record(self, cost: float, taken: bool, level: float):
+        if not taken:
+            self.rejected += 1
+            raise QuotaExceeded(cost, retry_after=(cost - level) / self.rate)
+        self.allowed += 1
+
+    def settle(self, api_key: str, charged: float, actual: float = None):
+        """
+        Correct an up-front charge once the actual token count is known.
+        """
+        if actual is None or actual == charged:
+            return
+        self.backend.give(self.bucket_key(api_key), charged - actual, self.rate, self.burst, time.time())
+
+    async def asettle(self, api_key: str, charged: float, actual: float = None):
+        """
+        Like settle, without blocking the event loop on the backend.
+        """
+        if actual is None or actual == charged:
+            return
+        await call_backend(
+            self.backend, self.backend.give, self.bucket_key(api_key), charged - actual, self.rate, self.burst, time.time()
+        )
+
+    def stats(self):
+        """
+        Get quota settings and allow/reject counters for monitoring.
+        """
+        return {
+            "backend": type(self.backend).__name__,
+            "tokens_per_minute": self.rate * 60,
+            "burst": self.burst,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class RenderCache:
+    """
+    Content-addressed on-disk cache of rendered resumes (tex source and PDF bytes).
+
+    Entries are keyed on the canonical request and the template's content hash, and each artifact
+    kind is stored in its own file, so a "tex" request and a later "pdf" request for the same resume
+    share the tex entry. The directory is kept under max_bytes by evicting least recently used files;
+    file mtimes record recency so the order survives restarts. Workers sharing the directory each
+    rescan it before evicting, so the bound holds for the directory as a whole.
+    """
+
+    KINDS = ("tex", "pdf")
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # file name -> size, least recently used first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build the cache configured by RENDER_CACHE_DIR and RENDER_CACHE_MAX_BYTES.
+        Returns None when RENDER_CACHE_MAX_BYTES is 0.
+        """
+        max_bytes = int(os.getenv('RENDER_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+        if max_bytes <= 0:
+            return None
+        return cls(os.getenv('RENDER_CACHE_DIR', 'Database/render_cache'), max_bytes)
+
+    @staticmethod
+    def make_key(request: dict, template_id: str) -> str:
+        """
+        Hash the request (without output_format, which only selects artifacts) and the template id.
+        """
+        payload = {name: value for name, value in request.items() if name != "output_format"}
+        canonical = json.dumps(
+            {"request": payload, "template": template_id},
+            sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _load(self):
+        """
+        Index the files already on disk, oldest first, and drop leftovers from interrupted writes.
+        """
+        for path in self.cache_dir.glob("*.tmp"):
+            path.unlink(missing_ok=True)
+        files = self._scan()
+        with self._lock:
+            self._index(files)
+            self._evict()
+
+    def _scan(self):
+        """
+        List the artifacts on disk, including other workers' writes, as (mtime, name, size).
+        """
+        files = []
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if os.path.splitext(entry.name)[1][1:] not in self.KINDS:
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # Evicted by another worker meanwhile
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        return files
+
+    def _index(self, files):
+        self._entries = OrderedDict((name, size) for _, name, size in sorted(files))
+        self.total_bytes = sum(self._entries.values())
+
+    def get(self, key: str, kind: str) -> Optional[bytes]:
+        """
+        Get a cached artifact, or None on a miss.
+        """
+        name = f"{key}.{kind}"
+        path = self.cache_dir / name
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+                self._forget(name)
+            return None
+
+        with self._lock:
+            self.hits += 1
+            # Another worker may have written the file; index it either way
+            if name not in self._entries:
+                self._entries[name] = len(data)
+                self.total_bytes += len(data)
+            self._entries.move_to_end(name)
+        return data
+
+    def put(self, key: str, kind: str, data: bytes):
+        """
+        Store an artifact, evicting least recently used files if the cache grows past max_bytes.
+        """
+        if len(data) > self.max_bytes:
+            return
+        name = f"{key}.{kind}"
+        # Write then rename so readers never see a partial artifact
+        partial_path = self.cache_dir / f"{name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            partial_path.write_bytes(data)
+            os.replace(partial_path, self.cache_dir / name)
+        except OSError as e:
+            partial_path.unlink(missing_ok=True)
+            logging.getLogger("uvicorn").error("Could not store rendered resume %s: %s", name, e)
+            return
+
+        # Other workers write to the same directory, so size and recency come from the disk, not this index
+        files = self._scan()
+        with self._lock:
+            self._index(files)
+            self._evict()
+
+    def _forget(self, name: str):
+        size = self._entries.pop(name, None)
+        if size is not None:
+            self.total_bytes -= size
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            (self.cache_dir / name).unlink(missing_ok=True)
+
+    def stats(self):
+        """
+        Get size and hit/miss counters for monitoring.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
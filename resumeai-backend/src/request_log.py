@@ -0,0 +1,210 @@
+import atexit
+import contextvars
+import copy
+import datetime
+import json
+import logging
+import os
+import queue
+import time
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from dotenv import load_dotenv
+from metrics import REQUEST_SECONDS, REQUESTS, STAGE_SECONDS
+
+load_dotenv()
+
+LOG_FILE_PATTERN = "logfile_%Y_%m_%d.log"
+
+# Attributes every LogRecord has; anything else on a record was passed through `extra=` and becomes a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message", "asctime", "taskName",
+    "color_message",  # uvicorn's colored copy of the message
+}
+
+# Seconds spent per stage by the request being handled, or None outside a request
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def add_timing(stage: str, seconds: float):
+    """
+    Record time spent in a stage ("db", "llm", "compile", ...) in the stage latency histogram and,
+    when called while handling a request, in that request's access record. Time spent concurrently
+    (e.g. a batch's compiles) is summed in the access record.
+    """
+    STAGE_SECONDS.observe(seconds, stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed(stage: str):
+    """
+    Time the block and record it under stage, as add_timing does.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(stage, time.perf_counter() - start)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, logger and message, plus any fields passed through `extra=`.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES:
+                entry[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DailyFileHandler(logging.FileHandler):
+    """
+    Appends to log_dir/logfile_%Y_%m_%d.log, moving on to a new file when the date changes.
+    """
+
+    def __init__(self, log_dir: str, pattern: str = LOG_FILE_PATTERN):
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.pattern = pattern
+        self.day = datetime.date.today()
+        super().__init__(self.log_dir / self.day.strftime(pattern), encoding="utf-8", delay=True)
+
+    def emit(self, record):
+        today = datetime.date.today()
+        if today != self.day:
+            self.day = today
+            if self.stream:
+                self.stream.close()
+                self.stream = None  # reopened by FileHandler.emit under the new name
+            self.baseFilename = os.path.abspath(self.log_dir / today.strftime(self.pattern))
+        super().emit(record)
+
+
+class _DeferredFormatQueueHandler(QueueHandler):
+    """
+    Queues records for the listener thread. Only the message is resolved here, since its arguments
+    may change once the call returns; JSON encoding and the file write happen on the listener.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class LogWriter:
+    """
+    Routes the root and "uvicorn" loggers through an in-memory queue to a background thread that
+    writes JSON lines to the daily log file, so logging never blocks the event loop on file I/O.
+    """
+
+    def __init__(self, log_dir: str = "logs", level: str = None):
+        self.level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+        file_handler = DailyFileHandler(log_dir)
+        file_handler.setFormatter(JsonFormatter())
+        log_queue = queue.SimpleQueue()
+        self.handler = _DeferredFormatQueueHandler(log_queue)
+        self.listener = QueueListener(log_queue, file_handler)
+        self._running = False
+
+    def start(self):
+        root = logging.getLogger()
+        root.setLevel(self.level)
+        root.addHandler(self.handler)
+        # uvicorn configures its own logger not to propagate; give it the queue directly
+        uvicorn_logger = logging.getLogger("uvicorn")
+        uvicorn_logger.setLevel(self.level)
+        uvicorn_logger.propagate = False
+        uvicorn_logger.addHandler(self.handler)
+        self.listener.start()
+        self._running = True
+        atexit.register(self.stop)
+
+    def stop(self):
+        """
+        Detach from the loggers and write out whatever is still queued.
+        """
+        if not self._running:
+            return
+        self._running = False
+        logging.getLogger().removeHandler(self.handler)
+        logging.getLogger("uvicorn").removeHandler(self.handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+
+class AccessLogMiddleware:
+    """
+    ASGI middleware logging one JSON access record per HTTP request once its response has been
+    sent (so streamed responses are timed to the last byte): method, endpoint, status, user id,
+    duration and the time spent per stage as reported through add_timing. Request counts and
+    durations also go to the request metrics.
+    """
+
+    def __init__(self, app, logger_name: str = "resumeai.access"):
+        self.app = app
+        self.logger = logging.getLogger(logger_name)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = {}
+        token = _request_timings.set(timings)
+        status = 500  # reported if the app fails before starting a response
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            _request_timings.reset(token)
+            # Route templates keep endpoints like /create-resume/jobs/{job_id} groupable;
+            # unmatched paths are lumped together so scanners cannot grow the metrics without bound
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            REQUEST_SECONDS.observe(duration, scope["method"], endpoint)
+            REQUESTS.inc(scope["method"], endpoint, status)
+            if self.logger.isEnabledFor(logging.INFO):
+                endpoint = getattr(route, "path", None) or scope["path"]
+                principal = scope.get("state", {}).get("principal")
+                fields = {
+                    "method": scope["method"],
+                    "endpoint": endpoint,
+                    "status": status,
+                    "user_id": getattr(principal, "user_id", None),
+                    "duration_ms": round(duration * 1000, 1),
+                }
+                for stage, seconds in timings.items():
+                    fields[f"{stage}_ms"] = round(seconds * 1000, 1)
+                self.logger.info("%s %s %s", scope["method"], endpoint, status, extra=fields)
@@ -1,88 +1,244 @@
 from TexSoup import TexSoup
 from TexSoup.data import TexCmd, BraceGroup
+import copy
+import hashlib
 import logging
 import os
+import re
 import subprocess
+import tempfile
+import threading
+from functools import lru_cache
 from pathlib import Path
-from time import strftime
+from time import perf_counter, strftime
+from latex_format import precompiled_formats
+from request_log import timed
 
-class ResumeTexGenerator:
-        
-    def escape_latex(self, text):
+TEMPLATE_DIR = Path('latex_templates')
+DEFAULT_TEMPLATE = TEMPLATE_DIR / '1.tex'
+
+# Placeholder commands defined by the templates and filled per request
+PLACEHOLDERS = (
+    'infoPlaceholder',
+    'sectionPlaceholder',
+    'eduPlaceholder',
+    'summaryPlaceholder',
+    'expPlaceholder',
+    'projectsPlaceholder',
+    'techSkillsPlaceholder',
+    'softSkillsPlaceholder',
+)
+
+class ParsedTemplate:
+    """
+    A LaTeX template parsed once with TexSoup, with its placeholder commands located up front.
+    """
+
+    def __init__(self, path):
+        with open(path) as f:
+            soup = TexSoup(f, tolerance=1)
+        # Identifies the template's content, e.g. for keying rendered output
+        self.digest = hashlib.sha256(Path(path).read_bytes()).hexdigest()
+        self.expr = soup.expr
+        self._string_template = None
+        # Index 0 of each list is the \newcommand definition, the rest are uses in the document body
+        self.placeholders = {name: [node.expr for node in soup.find_all(name)] for name in PLACEHOLDERS}
+
+    def instantiate(self):
         """
-        Escape special LaTeX characters in a string.
+        Return a private copy of the document tree and of its placeholder commands for one request.
         """
-        if not isinstance(text, str):
-            text = str(text)
-        
-        # Dictionary of LaTeX special characters and their escaped versions
-        latex_special_chars = {
-            '\\': r'\textbackslash{}',
-            '{': r'\{',
-            '}': r'\}',
-            '$': r'\$',
-            '&': r'\&',
-            '%': r'\%',
-            '#': r'\#',
-            '^': r'\textasciicircum{}',
-            '_': r'\_',
-            '~': r'\textasciitilde{}',
-            '<': r'\textless{}',
-            '>': r'\textgreater{}',
-            '|': r'\textbar{}',
-        }
-        
-        # Escape each special character
-        for char, escaped in latex_special_chars.items():
-            text = text.replace(char, escaped)
-        
-        return text
+        memo = {}
+        expr = copy.deepcopy(self.expr, memo)
+        # deepcopy records original id -> copy, which maps the placeholders without searching the tree again
+        placeholders = {name: [memo[id(cmd)] for cmd in cmds] for name, cmds in self.placeholders.items()}
+        return expr, placeholders
 
-    def escape_dict_values(self, data):
+    @property
+    def string_template(self):
         """
-        Recursively escape LaTeX special characters in dictionary values.
-        Handles nested dictionaries and lists.
+        The template compiled into literal segments and placeholder slots, built on first use.
         """
-        for key, value in data.items():
-            if isinstance(value, str):
-                data[key] = self.escape_latex(value)
-            elif isinstance(value, dict):
-                self.escape_dict_values(value)
-            elif isinstance(value, list):
-                for i, listItem in enumerate(value):
-                    if isinstance(value[i], str):
-                        data[key][i] = self.escape_latex(listItem)
-                    elif isinstance(listItem, dict):
-                        self.escape_dict_values(listItem)
-
-    def __init__(self, request):
+        if self._string_template is None:
+            self._string_template = StringTemplate(self)
+        return self._string_template
+
+class StringTemplate:
+    """
+    A parsed template pre-rendered into literal segments around its placeholder slots.
+    Rendering joins precomputed strings and produces the same text as filling the TexSoup tree.
+    """
+
+    SLOT_MARKER = re.compile(r'\{\x00(\w+):(\d+)\x00\}')
+
+    def __init__(self, parsed: ParsedTemplate):
+        expr, placeholders = parsed.instantiate()
+        # Slot (name, index) -> the placeholder's original arguments, kept when a section is not filled
+        self.defaults = {}
+        for name, cmds in placeholders.items():
+            for index, cmd in enumerate(cmds[1:], start=1):
+                self.defaults[(name, index)] = ''.join(str(arg) for arg in cmd.args)
+                cmd.args.clear()
+                cmd.args.append(BraceGroup(f'\x00{name}:{index}\x00'))
+
+        # re.split alternates literal text with the (name, index) groups of each marker
+        pieces = self.SLOT_MARKER.split(str(expr))
+        self.segments = pieces[0::3]
+        self.slots = [(name, int(index)) for name, index in zip(pieces[1::3], pieces[2::3])]
+
+    def render(self, values: dict) -> str:
+        """
+        Render the document, filling each slot from values and falling back to the template's own content.
+        """
+        parts = [self.segments[0]]
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            parts.append(values.get(slot, self.defaults[slot]))
+            parts.append(segment)
+        return ''.join(parts)
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+def get_template(path=DEFAULT_TEMPLATE) -> ParsedTemplate:
+    """
+    Get the parsed template for path, parsing it only on first use in this process.
+    """
+    path = Path(path)
+    template = _templates.get(path)
+    if template is None:
+        with _templates_lock:
+            template = _templates.get(path)
+            if template is None:
+                template = _templates[path] = ParsedTemplate(path)
+    return template
+
+def template_path(template_id: str) -> Path:
+    """
+    Resolve a template id (the file name without .tex) to its path in TEMPLATE_DIR.
+    Raises ValueError for ids that are not templates there.
+    """
+    path = TEMPLATE_DIR / f"{template_id}.tex"
+    if path.name != f"{template_id}.tex" or not path.is_file():
+        raise ValueError(f"Unknown resume template: {template_id}")
+    return path
+
+# LaTeX special characters and their escaped versions
+LATEX_SPECIAL_CHARS = {
+    '\\': r'\textbackslash{}',
+    '{': r'\{',
+    '}': r'\}',
+    '$': r'\$',
+    '&': r'\&',
+    '%': r'\%',
+    '#': r'\#',
+    '^': r'\textasciicircum{}',
+    '_': r'\_',
+    '~': r'\textasciitilde{}',
+    '<': r'\textless{}',
+    '>': r'\textgreater{}',
+    '|': r'\textbar{}',
+}
+# One capturing alternation: split() alternates plain text with the special characters matched
+_LATEX_SPECIAL_PATTERN = re.compile('([' + re.escape(''.join(LATEX_SPECIAL_CHARS)) + '])')
+
+# Only short values (names, titles, skills) repeat often enough to be worth memoizing
+ESCAPE_MEMO_MAX_LENGTH = 64
+
+def _escape_latex_once(text):
+    parts = _LATEX_SPECIAL_PATTERN.split(text)
+    if len(parts) == 1:
+        return text
+    parts[1::2] = [LATEX_SPECIAL_CHARS[char] for char in parts[1::2]]
+    return ''.join(parts)
+
+_escape_latex_memo = lru_cache(maxsize=4096)(_escape_latex_once)
+
+def escape_latex(text):
+    """
+    Escape special LaTeX characters in a string.
+    The text is scanned once, so replacements are never escaped again.
+    """
+    if not isinstance(text, str):
+        text = str(text)
+    if len(text) <= ESCAPE_MEMO_MAX_LENGTH:
+        return _escape_latex_memo(text)
+    return _escape_latex_once(text)
+
+def escape_dict_values(data):
+    """
+    Return a new structure with LaTeX special characters escaped in every string value.
+    Handles nested dictionaries and lists; keys and non-string values are kept as is.
+    """
+    if isinstance(data, str):
+        return escape_latex(data)
+    if isinstance(data, dict):
+        return {key: escape_dict_values(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [escape_dict_values(item) for item in data]
+    return data
+
+def _ram_backed_dir():
+    """
+    /dev/shm when it is a writable directory (a tmpfs on Linux), else None for the system temp dir
+    """
+    shm = Path('/dev/shm')
+    return str(shm) if shm.is_dir() and os.access(shm, os.W_OK) else None
+
+# Parent of the per-compile build directories; RAM-backed when available so compiles skip the disk
+LATEX_SCRATCH_DIR = os.getenv('LATEX_SCRATCH_DIR') or _ram_backed_dir()
+
+# How PDFs are compiled: "latexmk" (reruns as its dependency analysis decides) or
+# "pdflatex" (the engine called directly for a fixed number of passes)
+LATEX_COMPILE_BACKEND = os.getenv('LATEX_COMPILE_BACKEND', 'latexmk').lower()
+COMPILE_BACKENDS = ('latexmk', 'pdflatex')
+# Resumes have no references or table of contents, so one pass is enough
+LATEX_PDFLATEX_PASSES = int(os.getenv('LATEX_PDFLATEX_PASSES', 1))
+
+# Renderer used by generate_tex: "string" (segment joining) or "texsoup" (tree manipulation)
+RESUME_RENDERER = os.getenv('RESUME_RENDERER', 'string').lower()
+
+class ResumeTexGenerator:
+
+    escape_latex = staticmethod(escape_latex)
+    escape_dict_values = staticmethod(escape_dict_values)
+
+    def __init__(self, request, use_format: bool = None, renderer: str = None, compile_backend: str = None,
+                 template: Path = None):
         logger = logging.getLogger("uvicorn")
-        self.payload = request
-        # excape characters
-        self.escape_dict_values(self.payload)
-        logger.info("payload inside:",self.payload)
+        # excape characters into a new payload, leaving the request untouched
+        with timed("escape"):
+            self.payload = escape_dict_values(request)
+        logger.debug("Escaped resume payload: %s", self.payload)
         self.name= self.payload["information"]['name']
         self.phone=self.payload["information"]["phone"]
         self.email=self.payload["information"]["email"]
         self.linkedin=self.payload["information"]["linkedin"]
         self.github=self.payload["information"]["github"]
-        self.user_id = self.payload["information"]["name"].replace(" ", '') + "-" + strftime("%Y%m%d-%H%M%S")
         
-        self.tex_template = Path('latex_templates') / '1.tex'
-        self.output_dir = Path('generated_resumes')
-        self.filled_tex_file = Path(self.output_dir) / f"{self.user_id}.tex"
-        self.compiled_pdf_file = Path(self.output_dir) / f"{self.user_id}.pdf"
+        self.tex_template = Path(template or DEFAULT_TEMPLATE)
+        # Each compile has its own build directory, so the job name does not need to be unique
+        self.jobname = 'resume'
+        
+        # Compile against the template's precompiled preamble format when available
+        if use_format is None:
+            use_format = os.getenv('LATEX_PRECOMPILED_FORMAT', 'true').lower() in ('1', 'true', 'yes')
+        self.use_format = use_format
+        self.renderer = renderer or RESUME_RENDERER
+        self.compile_backend = compile_backend or LATEX_COMPILE_BACKEND
+        if self.compile_backend not in COMPILE_BACKENDS:
+            raise ValueError(f"Unknown LaTeX compile backend: {self.compile_backend}")
+        self.compile_seconds = None  # Wall time of the last compile, set by generate_pdf
         
         self.tex_filled = False # Flag to check if the tex file is filled
-        with open(self.tex_template) as f:
-            self.soup = TexSoup(f, tolerance=1)
+        self.tex_content = None
+        self.template = get_template(self.tex_template)
         
-    def fill_info(self, soup:TexSoup):
+    def fill_info(self, placeholders: dict):
         """
         Fills the personal information section of the resume template.
         """
         # Create complete personal info section in one go
-        info = soup.find_all('infoPlaceholder')[1]
+        info = placeholders['infoPlaceholder'][1]
         personal_info = [
             BraceGroup(TexCmd('Huge', [TexCmd('scshape', [BraceGroup(self.name)])])),
             BraceGroup(r' \\ '),
@@ -109,13 +265,13 @@ class ResumeTexGenerator:
         #     info.args.append(n)
         info.args.extend(personal_info)
         
-    def fill_education(self, soup: TexSoup):
+    def fill_education(self, placeholders: dict):
         """
         Fills the education section of the resume template.
         """
         # Create Education Section
-        edu = soup.find_all('eduPlaceholder')[1]
-        section = soup.find_all('sectionPlaceholder')[1]
+        edu = placeholders['eduPlaceholder'][1]
+        section = placeholders['sectionPlaceholder'][1]
         section.args.clear()
         section.args.append(TexCmd('section', [BraceGroup('Education')]))
         edu.args.clear()
@@ -128,23 +284,23 @@ class ResumeTexGenerator:
             ])
             edu.args.append(new_edu)
         
-    def fill_summary(self, soup: TexSoup):
+    def fill_summary(self, placeholders: dict):
         """
         Fills the summary section of the resume template.
         """
-        section = soup.find_all('sectionPlaceholder')[2]
+        section = placeholders['sectionPlaceholder'][2]
         section.args.clear()
         section.args.append(TexCmd('section', [BraceGroup('Summary')]))
         
-        summary = soup.find_all('summaryPlaceholder')[1]
+        summary = placeholders['summaryPlaceholder'][1]
         sum_body = self.payload["information"]["summary"]
         summary.args[0].string = sum_body
 
-    def fill_experience(self, soup: TexSoup):
-        section = soup.find_all('sectionPlaceholder')[3]
+    def fill_experience(self, placeholders: dict):
+        section = placeholders['sectionPlaceholder'][3]
         section.args.clear()
         section.args.append(TexCmd('section', [BraceGroup('Experience')]))
-        experience = soup.find_all('expPlaceholder')[1]
+        experience = placeholders['expPlaceholder'][1]
         experience.args.clear()
         for exp_item in self.payload["experience"]:
             new_exp = TexCmd('resumeSubheading', [
@@ -160,14 +316,14 @@ class ResumeTexGenerator:
             full_exp_entry.extend(achievements)
             experience.args.extend(full_exp_entry)
 
-    def fill_projects(self, soup: TexSoup):
+    def fill_projects(self, placeholders: dict):
         """
         Fills the projects section of the resume template.
         """
-        section = soup.find_all('sectionPlaceholder')[4]
+        section = placeholders['sectionPlaceholder'][4]
         section.args.clear()
         section.args.append(TexCmd('section', [BraceGroup('Projects')]))
-        projects = soup.find_all('projectsPlaceholder')[1]
+        projects = placeholders['projectsPlaceholder'][1]
         projects.args.clear()
         for proj_item in self.payload["projects"]:
             new_proj = TexCmd('resumeProjectHeading', [
@@ -181,15 +337,15 @@ class ResumeTexGenerator:
             full_proj_entry.extend(achievements)
             projects.args.extend(full_proj_entry)
 
-    def fill_tech_skills(self, soup: TexSoup):
+    def fill_tech_skills(self, placeholders: dict):
         """
         Fills the technical skills section of the resume template.
         """
-        section = soup.find_all('sectionPlaceholder')[5]
+        section = placeholders['sectionPlaceholder'][5]
         section.args.clear()
         section.args.append(TexCmd('section', [BraceGroup('Technical Skills')]))
         
-        tech_skills = soup.find_all('techSkillsPlaceholder')[1]
+        tech_skills = placeholders['techSkillsPlaceholder'][1]
         tech_skills.args.clear()
         skills_content = []
         for key, value in self.payload["technical_skills"].items():
@@ -199,83 +355,205 @@ class ResumeTexGenerator:
         
         tech_skills.args.extend(skills_content)
 
-    def fill_soft_skills(self, soup: TexSoup):
-        section = soup.find_all('sectionPlaceholder')[6]
+    def fill_soft_skills(self, placeholders: dict):
+        section = placeholders['sectionPlaceholder'][6]
         section.args.clear()
         section.args.append(TexCmd('section', [BraceGroup('Soft Skills')]))
-        soft_skills = soup.find_all('softSkillsPlaceholder')[1]
+        soft_skills = placeholders['softSkillsPlaceholder'][1]
         soft_skills.args.clear()
         soft_skills_content = TexCmd('emph', '{'+', '.join(self.payload['soft_skills']) + '}')
         soft_skills.args.append(soft_skills_content)
 
+    def render_sections(self) -> dict:
+        """
+        Render the filled sections as strings keyed by placeholder slot, for the string renderer.
+        Each entry matches what the corresponding fill_* method produces with TexSoup.
+        """
+        values = {}
+        info = self.payload["information"]
+
+        if len(info) >= 6:
+            values[('infoPlaceholder', 1)] = (
+                '{\\Huge\\scshape{' + self.name + '}}'
+                + '{' + r' \\ ' + '}'
+                + '\\vspace{1pt}'
+                + '\\small'
+                + '\\raisebox{' + r'-0.1\height' + '}' + '\\faPhone' + f'\\ {self.phone} ~ '
+                + '\\href{' + 'mailto:' + self.email + '}'
+                + '{' + r'\raisebox{-0.2\height}\faEnvelope\  \underline{' + self.email + '}}'
+                + ' ~ '
+                + '\\href{' + self.linkedin + '}'
+                + '{' + r'\raisebox{-0.2\height}\faLinkedin\  \underline{' + self.linkedin + '}}'
+                + ' ~ '
+                + '\\href{{' + self.github + '}}'
+                + '{' + r'\raisebox{-0.2\height}\faGithub\  \underline{' + self.github + '}}'
+                + '\\vspace{-8pt}'
+            )
+
+        if info.get("summary"):
+            values[('sectionPlaceholder', 2)] = '\\section{Summary}'
+            values[('summaryPlaceholder', 1)] = '{' + info["summary"] + '}'
+
+        if self.payload["education"]:
+            values[('sectionPlaceholder', 1)] = '\\section{Education}'
+            values[('eduPlaceholder', 1)] = ''.join(
+                '\\resumeEduSubheading'
+                + '{' + edu_item["school"] + '}'
+                + '{' + str(edu_item["start_date"]) + " - " + str(edu_item["end_date"]) + '}'
+                + '{' + edu_item["degree"] + '}'
+                + '{}'
+                for edu_item in self.payload["education"]
+            )
+
+        if self.payload.get("experience"):
+            values[('sectionPlaceholder', 3)] = '\\section{Experience}'
+            values[('expPlaceholder', 1)] = ''.join(
+                '\\resumeSubheading'
+                + '{' + exp_item['title'] + '}'
+                + '{' + str(exp_item['start_date']) + " - " + str(exp_item['end_date']) + '}'
+                + '{' + exp_item['company'] + '}'
+                + '{}'
+                + '\\resumeItemListStart'
+                + ''.join('\\resumeItem{' + achievement + '.}' for achievement in exp_item['description'].split('. '))
+                + '\\resumeItemListEnd'
+                for exp_item in self.payload["experience"]
+            )
+
+        if self.payload.get("projects"):
+            values[('sectionPlaceholder', 4)] = '\\section{Projects}'
+            values[('projectsPlaceholder', 1)] = ''.join(
+                '\\resumeProjectHeading'
+                + '{' + f'\\textbf{{{proj_item["name"]}}} $|$ \\emph{{{proj_item["skills"]}}}' + '}'
+                + '{' + str(proj_item["end_date"]) + '}'
+                + '\\resumeItemListStart'
+                + ''.join(
+                    '\\resumeItem{' + achievement + '.}'
+                    for achievement in proj_item['description'].split('. ') if achievement.strip()
+                )
+                + '\\resumeItemListEnd'
+                for proj_item in self.payload["projects"]
+            )
+
+        if self.payload.get("technical_skills"):
+            values[('sectionPlaceholder', 5)] = '\\section{Technical Skills}'
+            values[('techSkillsPlaceholder', 1)] = ''.join(
+                '\\textbf{' + key + '}' + '{: ' + ', '.join(value) + '}' + '{' + r' \\ ' + '}'
+                for key, value in self.payload["technical_skills"].items()
+            )
+
+        if self.payload.get("soft_skills"):
+            values[('sectionPlaceholder', 6)] = '\\section{Soft Skills}'
+            values[('softSkillsPlaceholder', 1)] = '\\emph{' + ', '.join(self.payload['soft_skills']) + '}'
+
+        return values
+
     def generate_tex(self):
         """
         This method fills in all sections of the resume template based on the provided payload.
-        The generated LaTeX code is saved to soup and can be compiled to PDF later.
+        The generated LaTeX code is saved to tex_content and can be compiled to PDF later.
         
         """
+        with timed("tex_render"):
+            return self._generate_tex()
+
+    def _generate_tex(self):
+        if self.renderer == "string":
+            self.tex_content = self.template.string_template.render(self.render_sections())
+            self.tex_filled = True
+            return self.tex_content
         
-        with open(self.tex_template) as f:
-            self.soup = TexSoup(f, tolerance=1)
-            
-            # Fill all data
-            if len(self.payload["information"]) >= 6:
-                self.fill_info(self.soup)
-            
-            if self.payload["information"].get("summary"):
-                self.fill_summary(self.soup)
-            
-            if self.payload["education"]:
-                self.fill_education(self.soup)
-            
-            if self.payload.get("experience"):
-                self.fill_experience(self.soup)
-            
-            if self.payload.get("projects"):
-                self.fill_projects(self.soup)
-            
-            if self.payload.get("technical_skills"):
-                self.fill_tech_skills(self.soup)
+        self.soup, placeholders = self.template.instantiate()
+        
+        # Fill all data
+        if len(self.payload["information"]) >= 6:
+            self.fill_info(placeholders)
+        
+        if self.payload["information"].get("summary"):
+            self.fill_summary(placeholders)
+        
+        if self.payload["education"]:
+            self.fill_education(placeholders)
+        
+        if self.payload.get("experience"):
+            self.fill_experience(placeholders)
+        
+        if self.payload.get("projects"):
+            self.fill_projects(placeholders)
+        
+        if self.payload.get("technical_skills"):
+            self.fill_tech_skills(placeholders)
+        
+        if self.payload.get("soft_skills"):
+            self.fill_soft_skills(placeholders)
             
-            if self.payload.get("soft_skills"):
-                self.fill_soft_skills(self.soup)
-                
-            self.tex_filled = True
-            return str(self.soup)
+        self.tex_filled = True
+        self.tex_content = str(self.soup)
+        return self.tex_content
             
-    def generate_pdf(self):
+    def compile_commands(self, fmt: Path = None) -> list:
+        """
+        The compiler runs for the configured backend, in order, with fmt as the precompiled format if given.
+        """
+        if self.compile_backend == 'pdflatex':
+            command = [
+                'pdflatex',
+                '-interaction=nonstopmode',
+                '-halt-on-error',
+                f'-jobname={self.jobname}',
+            ]
+            if fmt:
+                command.append(f'-fmt={fmt.stem}')
+            command.append(f"{self.jobname}.tex")
+            return [command] * LATEX_PDFLATEX_PASSES
+
+        command = [
+            'latexmk',
+            '-pdf',
+            '-f',
+            f'-jobname={self.jobname}',
+        ]
+        if fmt:
+            # Skip re-loading the preamble packages; the format already holds them
+            command.append(f'-pdflatex=pdflatex -fmt={fmt.stem} %O %S')
+        command.append(f"{self.jobname}.tex")
+        return [command]
+
+    def generate_pdf(self, build_dir) -> Path:
+        """
+        Compile the resume inside build_dir and return the path of the PDF.
+        build_dir should belong to this compile alone; every file is written there.
+        """
         # Save tex file for compilation
         if not self.tex_filled:
             self.generate_tex()
             
-            
-        os.makedirs(self.output_dir, exist_ok=True)
-        with open(self.filled_tex_file, 'w') as f:
-            cleaned_output = str(self.soup).replace('section{}', 'section')
+        build_dir = Path(build_dir)
+        with open(build_dir / f"{self.jobname}.tex", 'w') as f:
+            cleaned_output = self.tex_content.replace('section{}', 'section')
             f.write(cleaned_output)
         
-        # Convert Path object to string for subprocess
-        working_dir = str(self.output_dir.absolute())
+        env = None
+        fmt = precompiled_formats.get(self.tex_template) if self.use_format else None
+        if fmt:
+            env = precompiled_formats.compile_env()
         
-        subprocess.run([
-            'latexmk',
-            '-pdf',
-            '-f',
-            f'-jobname={self.user_id}',
-            f"{self.user_id}.tex"
-        ], cwd=working_dir, check=True, capture_output=True, timeout=5)
+        start = perf_counter()
+        for command in self.compile_commands(fmt):
+            subprocess.run(command, cwd=str(build_dir), env=env, check=True, capture_output=True, timeout=5)
+        self.compile_seconds = perf_counter() - start
         
-        #print(f"PDF generated at: {self.compiled_pdf_file}")
-        return self.compiled_pdf_file
+        return build_dir / f"{self.jobname}.pdf"
     
-    def cleanup(self):
+    def build_pdf(self):
         """
-        Cleans up generated files after compilation.
+        Compile the resume in a private scratch directory and return the PDF bytes.
+        The directory and everything the compiler wrote to it are removed afterwards.
+        Blocking; meant to run on a compile worker.
         """
-        # Cleaning up auxiliary files
-        subprocess.run(['latexmk', '-C'], cwd=self.output_dir, check=True)
-        os.remove(self.filled_tex_file)
-    
+        with tempfile.TemporaryDirectory(prefix='resume-', dir=LATEX_SCRATCH_DIR) as build_dir:
+            pdf_path = self.generate_pdf(build_dir)
+            with timed("pdf_read"):
+                return pdf_path.read_bytes()
 
         
 def main():
@@ -341,12 +619,13 @@ def main():
     generator = ResumeTexGenerator(request)
     print("Generated LaTeX content!")
     print()
-    escape_dict_values(request)
     print("Escaped request payload:")
-    print(request)
-    generator.generate_pdf()
-    print("PDF generated successfully!")
-    generator.cleanup()
+    print(escape_dict_values(request))
+    output_dir = Path('generated_resumes')
+    os.makedirs(output_dir, exist_ok=True)
+    pdf_file = output_dir / f"{request['information']['name'].replace(' ', '')}-{strftime('%Y%m%d-%H%M%S')}.pdf"
+    pdf_file.write_bytes(generator.build_pdf())
+    print(f"PDF generated at: {pdf_file}")
     
     
 if __name__ == "__main__":
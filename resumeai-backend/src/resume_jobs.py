@@ -0,0 +1,322 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import secrets
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+from compile_service import CompileQueueFull
+
+# Shape of the ids secrets.token_urlsafe(16) produces
+JOB_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{22}")
+# How often a long-poll re-reads a job that another worker is rendering
+JOB_POLL_INTERVAL = 0.25
+
+
+class ResumeJobQueueFull(Exception):
+    """
+    Raised when a job is submitted while the job queue is full.
+    """
+
+
+class ResumeJob:
+    """
+    One asynchronous resume render: its request, owner, progress and, once done, its artifacts.
+    """
+
+    def __init__(self, request_dict: dict, user_id: int, job_id: str = None, status: str = "queued",
+                 created_at: datetime = None, finished_at: datetime = None, error: str = None):
+        self.job_id = job_id or secrets.token_urlsafe(16)
+        self.request_dict = request_dict
+        self.user_id = user_id
+        self.status = status  # queued -> running -> done | failed
+        self.created_at = created_at or datetime.now(timezone.utc)
+        self.finished_at = finished_at
+        self.error = error
+        self.tex_file = None
+        self.pdf_file = None
+        self.finished = asyncio.Event()
+        # Awaited with the quota cost of the render once the job ends (0 if it failed); not stored
+        self.settle = None
+
+    def finish(self, status: str, error: str = None):
+        self.status = status
+        self.error = error
+        self.finished_at = datetime.now(timezone.utc)
+
+    def to_record(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "request": self.request_dict,
+            "user_id": self.user_id,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_record(cls, record: dict):
+        return cls(
+            record["request"], record["user_id"], job_id=record["job_id"], status=record["status"],
+            created_at=datetime.fromisoformat(record["created_at"]),
+            finished_at=datetime.fromisoformat(record["finished_at"]) if record["finished_at"] else None,
+            error=record["error"]
+        )
+
+
+class ResumeJobStore:
+    """
+    Job records and artifacts as files in a directory shared by every worker process on the host, so
+    any worker can answer a poll: <job_id>.json holds the record, <job_id>.tex and <job_id>.pdf the
+    artifacts. Files are replaced atomically, and each job's files expire `ttl` seconds after its
+    record was last written.
+    """
+
+    ARTIFACTS = ("tex", "pdf")
+
+    def __init__(self, job_dir: str, ttl: float):
+        self.job_dir = Path(job_dir)
+        self.job_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+
+    def _path(self, job_id: str, suffix: str) -> Optional[Path]:
+        # Job ids come from URLs; anything token_urlsafe could not have produced names no job
+        if not JOB_ID_PATTERN.fullmatch(job_id):
+            return None
+        return self.job_dir / f"{job_id}.{suffix}"
+
+    def _write(self, path: Path, data: bytes):
+        # Write then rename so other workers never read a partial file
+        partial_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            partial_path.write_bytes(data)
+            os.replace(partial_path, path)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+
+    def save(self, job: ResumeJob):
+        """
+        Write the job's record, after its artifacts if it has any.
+        """
+        if job.tex_file is not None:
+            self._write(self._path(job.job_id, "tex"), job.tex_file.encode())
+        if job.pdf_file is not None:
+            self._write(self._path(job.job_id, "pdf"), job.pdf_file)
+        self._write(self._path(job.job_id, "json"), json.dumps(job.to_record()).encode())
+
+    def load(self, job_id: str) -> Optional[ResumeJob]:
+        """
+        Read a job's record, or None if it does not exist or has expired.
+        """
+        path = self._path(job_id, "json")
+        try:
+            if path is None or path.stat().st_mtime + self.ttl <= time.time():
+                return None
+            return ResumeJob.from_record(json.loads(path.read_bytes()))
+        except FileNotFoundError:
+            return None
+
+    def load_artifacts(self, job: ResumeJob):
+        """
+        Read a finished job's artifacts into job.tex_file and job.pdf_file.
+        """
+        for kind in self.ARTIFACTS:
+            try:
+                data = self._path(job.job_id, kind).read_bytes()
+            except FileNotFoundError:
+                continue
+            if kind == "tex":
+                job.tex_file = data.decode()
+            else:
+                job.pdf_file = data
+
+    def delete(self, job_id: str):
+        for suffix in ("json", *self.ARTIFACTS):
+            self._path(job_id, suffix).unlink(missing_ok=True)
+
+    def sweep(self):
+        """
+        Delete the files of expired jobs, and leftovers of interrupted writes.
+        """
+        deadline = time.time() - self.ttl
+        with os.scandir(self.job_dir) as entries:
+            for entry in entries:
+                try:
+                    if entry.stat().st_mtime > deadline:
+                        continue
+                except FileNotFoundError:
+                    continue  # Swept by another worker meanwhile
+                if entry.name.endswith(".json"):
+                    self.delete(entry.name[:-len(".json")])
+                elif entry.name.endswith(".tmp"):
+                    Path(entry.path).unlink(missing_ok=True)
+
+
+class ResumeJobQueue:
+    """
+    Queue of resume render jobs worked off by a fixed set of asyncio workers.
+
+    Submitting returns at once; clients poll (or long-poll) the job and fetch its artifacts when done.
+    The worker process that accepts a job renders it, but job records and artifacts are kept in a
+    ResumeJobStore that every worker reads, so polls may land on any worker. Finished jobs, with
+    their artifacts, are dropped `ttl` seconds after they finish.
+    """
+
+    def __init__(self, render: Callable[[dict], Awaitable[tuple]], workers: int = None,
+                 max_queue: int = None, ttl: float = None, job_dir: str = None):
+        self.render = render  # request dict -> (tex_file, pdf_file, quota cost)
+        self.workers = workers or int(os.getenv('RESUME_JOB_WORKERS', os.cpu_count() or 1))
+        self.max_queue = max_queue or int(os.getenv('RESUME_JOB_QUEUE_SIZE', 1000))
+        self.ttl = ttl or float(os.getenv('RESUME_JOB_TTL', 600))
+        self.store = ResumeJobStore(job_dir or os.getenv('RESUME_JOB_DIR', 'Database/resume_jobs'), self.ttl)
+        self.jobs = {}  # This process's unfinished jobs
+        self.done = 0
+        self.failed = 0
+        self._queue = None
+        self._tasks = []
+
+    def start(self):
+        """
+        Start the workers and the expiry sweep; call from the running event loop.
+        """
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweep()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, request_dict: dict, user_id: int,
+                     settle: Callable[[int], Awaitable] = None) -> ResumeJob:
+        """
+        Queue a render and return its job. Raises ResumeJobQueueFull if the queue is full.
+        settle, if given, is awaited with the render's quota cost when the job ends, or 0 if it fails.
+        """
+        if self._queue.full():
+            raise ResumeJobQueueFull(f"Resume job queue is full ({self._queue.qsize()} waiting)")
+        job = ResumeJob(request_dict, user_id)
+        job.settle = settle
+        # Recorded before it is queued, so a worker's later updates are never overwritten
+        await asyncio.to_thread(self.store.save, job)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            await asyncio.to_thread(self.store.delete, job.job_id)
+            raise ResumeJobQueueFull(f"Resume job queue is full ({self._queue.qsize()} waiting)")
+        self.jobs[job.job_id] = job
+        return job
+
+    async def get(self, job_id: str, user_id: int) -> Optional[ResumeJob]:
+        """
+        Get a job by id, or None if it does not exist, has expired or belongs to another user.
+        """
+        job = self.jobs.get(job_id) or await asyncio.to_thread(self.store.load, job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    async def wait(self, job: ResumeJob, timeout: float) -> ResumeJob:
+        """
+        Wait up to timeout seconds for the job to finish, and return its latest state.
+        Jobs rendered by another worker are polled from the store.
+        """
+        local_job = self.jobs.get(job.job_id)
+        if local_job is not None:
+            try:
+                await asyncio.wait_for(local_job.finished.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            return local_job
+
+        deadline = time.monotonic() + timeout
+        while job.status in ("queued", "running"):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(JOB_POLL_INTERVAL, remaining))
+            job = await asyncio.to_thread(self.store.load, job.job_id) or job
+        return job
+
+    async def load_result(self, job: ResumeJob) -> ResumeJob:
+        """
+        Read a finished job's artifacts from the store.
+        """
+        await asyncio.to_thread(self.store.load_artifacts, job)
+        return job
+
+    async def _work(self):
+        logger = logging.getLogger("uvicorn")
+        while True:
+            job = await self._queue.get()
+            try:
+                job.status = "running"
+                await self._save(job)
+                cost = 0
+                try:
+                    job.tex_file, job.pdf_file, cost = await self._render(job)
+                    job.finish("done")
+                    self.done += 1
+                except subprocess.CalledProcessError as e:
+                    logger.error("LaTeX compilation failed for job %s: %s", job.job_id, e.stderr.decode(errors='replace'))
+                    job.finish("failed", error="PDF compilation failed")
+                    self.failed += 1
+                except Exception as e:
+                    logger.error("Error generating resume for job %s: %s", job.job_id, e)
+                    job.finish("failed", error="Error generating resume")
+                    self.failed += 1
+                await self._settle(job, cost)
+                await self._save(job)
+            finally:
+                self.jobs.pop(job.job_id, None)
+                job.finished.set()
+                self._queue.task_done()
+
+    async def _settle(self, job: ResumeJob, cost: int):
+        if job.settle is None:
+            return
+        try:
+            await job.settle(cost)
+        except Exception as e:
+            logging.getLogger("uvicorn").error("Could not settle the quota charge of resume job %s: %s", job.job_id, e)
+
+    async def _save(self, job: ResumeJob):
+        try:
+            await asyncio.to_thread(self.store.save, job)
+        except OSError as e:
+            logging.getLogger("uvicorn").error("Could not store resume job %s: %s", job.job_id, e)
+
+    async def _render(self, job: ResumeJob):
+        # Requests to /create-resume share the compile pool; wait for room rather than failing the job
+        while True:
+            try:
+                return await self.render(job.request_dict)
+            except CompileQueueFull:
+                await asyncio.sleep(1)
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(min(self.ttl, 60))
+            try:
+                await asyncio.to_thread(self.store.sweep)
+            except OSError as e:
+                logging.getLogger("uvicorn").error("Could not sweep expired resume jobs: %s", e)
+
+    def stats(self):
+        """
+        Get this process's queue depth, unfinished jobs by status and finished job counts for monitoring.
+        """
+        counts = {"queued": 0, "running": 0}
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        return {"workers": self.workers, "max_queue": self.max_queue, "ttl": self.ttl, **counts,
+                "done": self.done, "failed": self.failed}
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+import api_key_manager
+from Auth_DataBase.async_auth_database import AsyncAuthDatabase
+
+
+@pytest.fixture
+def auth_db(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'auth.db'}")
+    monkeypatch.delenv("ASYNC_DATABASE_URL", raising=False)
+    return AsyncAuthDatabase()
+
+
+def run(auth_db, scenario):
+    """
+    Run scenario(auth_db) on a fresh event loop against freshly created tables.
+    """
+    async def main():
+        await auth_db.init_models()
+        try:
+            return await scenario(auth_db)
+        finally:
+            await auth_db.close_all_connections()
+    return asyncio.run(main())
+
+
+def test_uses_aiosqlite(auth_db):
+    assert auth_db.engine.url.drivername == "sqlite+aiosqlite"
+
+
+def test_create_user_and_api_key(auth_db):
+    async def scenario(db):
+        user_id = await db.create_user("alice", "hash")
+        api_key = await db.create_api_key(user_id, "key-1")
+        return user_id, api_key, await db.get_principal_by_api_key("key-1"), await db.get_user_by_username("alice")
+
+    user_id, api_key, principal, user = run(auth_db, scenario)
+    assert api_key == "key-1"
+    assert principal == {"id": user_id, "username": "alice"}
+    assert user == {"id": user_id, "username": "alice", "password_hash": "hash"}
+
+
+def test_unknown_api_key(auth_db):
+    async def scenario(db):
+        return await db.get_principal_by_api_key("missing"), await db.check_api_key("missing")
+
+    assert run(auth_db, scenario) == (None, False)
+
+
+def test_get_user_api_keys(auth_db):
+    async def scenario(db):
+        alice = await db.create_user("alice", "hash")
+        bob = await db.create_user("bob", "hash-2")
+        await db.create_api_key(alice, "key-1")
+        await db.create_api_key(alice, "key-2")
+        await db.create_api_key(bob, "key-3")
+        return await db.get_user_api_keys(alice), await db.get_user_api_keys(await db.create_user("carol", "hash-3"))
+
+    alice_keys, carol_keys = run(auth_db, scenario)
+    assert sorted(key["api_key"] for key in alice_keys) == ["key-1", "key-2"]
+    assert carol_keys is None
+
+
+def test_delete_api_key(auth_db):
+    async def scenario(db):
+        user_id = await db.create_user("alice", "hash")
+        await db.create_api_key(user_id, "key-1")
+        deleted = await db.delete_api_key("key-1")
+        return deleted, await db.delete_api_key("key-1"), await db.get_principal_by_api_key("key-1")
+
+    assert run(auth_db, scenario) == (True, False, None)
+
+
+def test_api_key_manager_opens_the_sync_database_only_when_used(auth_db, monkeypatch):
+    opened = []
+    monkeypatch.setattr(api_key_manager, "AuthDatabase", lambda: opened.append(True) or "sync database")
+    manager = api_key_manager.APIKeyManager(async_auth_db=auth_db)
+
+    async def scenario(db):
+        user_id = await db.create_user("alice", "hash")
+        api_key = await manager.agenerate_new_api_key(user_id)
+        return await manager.authenticate(api_key)
+
+    assert run(auth_db, scenario).username == "alice"
+    assert opened == []
+    assert manager.auth_db == "sync database"
+    assert manager.auth_db == "sync database"
+    assert opened == [True]
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import time
+
+import request_log
+from compile_service import LatexCompileService
+from metrics import REGISTRY
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_cancelled_queued_compile_releases_its_slot():
+    service = LatexCompileService(workers=1, max_queue=2)
+    release = threading.Event()
+
+    async def scenario():
+        blocker = service.submit(release.wait)
+        wait_until(lambda: service.stats()["running"] == 1)
+        waiter = service.submit(lambda: "never runs")
+        assert service.stats()["queued"] == 1
+        waiter.cancel()
+        for _ in range(3):
+            await asyncio.sleep(0)  # let the cancellation reach the worker's future
+        assert service.stats()["queued"] == 0
+
+        release.set()
+        await blocker
+        # The queue has room for max_queue jobs again
+        results = await asyncio.gather(*(service.submit(lambda: "ok") for _ in range(service.max_queue)))
+        assert results == ["ok", "ok"]
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        service.shutdown()
+    assert service.stats()["queued"] == 0
+
+
+def test_shutdown_releases_queued_slots():
+    service = LatexCompileService(workers=1, max_queue=2)
+    release = threading.Event()
+
+    async def scenario():
+        service.executor.submit(release.wait)
+        service.submit(lambda: None)
+        assert service.stats()["queued"] == 1
+        service.shutdown(wait=False)
+        assert service.stats()["queued"] == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+
+
+def test_compile_runs_in_the_callers_context():
+    service = LatexCompileService(workers=1)
+    timings = {}
+
+    async def scenario():
+        token = request_log._request_timings.set(timings)
+        try:
+            await service.submit(request_log.add_timing, "tex_render", 0.5)
+        finally:
+            request_log._request_timings.reset(token)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        service.shutdown()
+    assert set(timings) == {"compile_wait", "tex_render"}
+    assert timings["tex_render"] == 0.5
+
+
+def test_backend_times_reach_the_metrics():
+    service = LatexCompileService(workers=1)
+    service.record_backend_time("latexmk", 0.2)
+    service.record_backend_time("pdflatex", 0.1)
+    service.shutdown()
+    scrape = REGISTRY.render()
+    assert 'resumeai_compile_seconds_count{backend="latexmk"}' in scrape
+    assert 'resumeai_compile_seconds_count{backend="pdflatex"}' in scrape
+    assert service.stats()["backends"]["latexmk"]["count"] == 1
@@ -0,0 +1,73 @@
+import copy
+
+import pytest
+
+from benchmarks.payloads import make_resume_payload
+from resume_creator import ESCAPE_MEMO_MAX_LENGTH, LATEX_SPECIAL_CHARS, escape_dict_values, escape_latex
+
+EXPECTED = {
+    # The old replace-per-character escaper produced \textbackslash\{\} here, escaping its own braces
+    '\\': r'\textbackslash{}',
+    '{': r'\{',
+    '}': r'\}',
+    '$': r'\$',
+    '&': r'\&',
+    '%': r'\%',
+    '#': r'\#',
+    '^': r'\textasciicircum{}',
+    '_': r'\_',
+    '~': r'\textasciitilde{}',
+    '<': r'\textless{}',
+    '>': r'\textgreater{}',
+    '|': r'\textbar{}',
+}
+
+
+def test_every_special_character_is_covered():
+    assert set(LATEX_SPECIAL_CHARS) == set(EXPECTED)
+
+
+@pytest.mark.parametrize("char, escaped", EXPECTED.items(), ids=list(EXPECTED))
+def test_special_character(char, escaped):
+    assert escape_latex(char) == escaped
+    assert escape_latex(f"a{char}b") == f"a{escaped}b"
+    assert escape_latex(char * 3) == escaped * 3
+
+
+def test_backslash_replacement_is_not_escaped_again():
+    assert escape_latex("C:\\bin") == r"C:\textbackslash{}bin"
+    assert escape_latex("\\{}") == r"\textbackslash{}\{\}"
+
+
+def test_all_special_characters_together():
+    assert escape_latex("".join(EXPECTED)) == "".join(EXPECTED.values())
+
+
+def test_values_past_the_memo_limit():
+    text = "a" * ESCAPE_MEMO_MAX_LENGTH + "\\"
+    assert escape_latex(text) == "a" * ESCAPE_MEMO_MAX_LENGTH + r"\textbackslash{}"
+
+
+def test_plain_and_non_string_values():
+    assert escape_latex("plain text 123") == "plain text 123"
+    assert escape_latex(42) == "42"
+
+
+def test_escape_dict_values_escapes_nested_values():
+    payload = make_resume_payload(2, 2)
+    payload["information"]["summary"] = "".join(EXPECTED)
+    payload["soft_skills"].append("C#")
+    escaped = escape_dict_values(payload)
+    assert escaped["information"]["summary"] == "".join(EXPECTED.values())
+    assert escaped["soft_skills"][-1] == r"C\#"
+    assert escaped["experience"][0]["title"] == r"Software Engineer \#0"
+    # Keys are left as is
+    assert list(escaped["technical_skills"]) == list(payload["technical_skills"])
+
+
+def test_escape_dict_values_does_not_mutate_its_input():
+    payload = make_resume_payload(2, 2)
+    payload["information"]["summary"] = "".join(EXPECTED)
+    snapshot = copy.deepcopy(payload)
+    escape_dict_values(payload)
+    assert payload == snapshot
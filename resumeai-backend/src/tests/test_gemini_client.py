@@ -0,0 +1,92 @@
+"""
+The async Gemini paths against benchmarks.fake_gemini over REST.
+"""
+import asyncio
+
+import pytest
+
+from benchmarks import fake_gemini
+from generation_endpoints import gemini_client, project_description_generator
+from generation_endpoints.project_description_generator import ProjectDescriptionGenerator
+from generation_endpoints.summary_generator import SummaryGenerator
+from models import ProjectDescriptionRequest, SummaryRequest
+
+REQUEST = SummaryRequest(current_title="Software Engineer", years_experience="5", skills="Python, FastAPI")
+
+
+@pytest.fixture(scope="module")
+def fake_server():
+    server, endpoint = fake_gemini.serve_in_thread()
+    yield endpoint
+    server.should_exit = True
+
+
+@pytest.fixture
+def generator(fake_server, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    monkeypatch.setattr(gemini_client, "GEMINI_TRANSPORT", "rest")
+    monkeypatch.setattr(gemini_client, "GEMINI_API_ENDPOINT", fake_server)
+    monkeypatch.setattr(gemini_client, "_configured", False)
+    monkeypatch.setattr(fake_gemini, "FAKE_GEMINI_LATENCY", 0.05)
+    return SummaryGenerator()
+
+
+def test_generate(generator):
+    result = asyncio.run(generator.agenerate_summary(REQUEST))
+    assert result["summary"].startswith("word0")
+    assert result["tokens_used"] > 0
+    assert result["cached"] is False
+
+
+def test_stream(generator):
+    async def collect():
+        return [chunk async for chunk in generator.astream_summary(REQUEST)]
+
+    chunks = asyncio.run(collect())
+    assert "".join(text for text, _ in chunks).startswith("word0")
+    assert chunks[-1][1] > 0
+
+
+def test_timeout_raises_timeout_error(generator, monkeypatch):
+    monkeypatch.setattr(fake_gemini, "FAKE_GEMINI_LATENCY", 2)
+    with pytest.raises(TimeoutError):
+        asyncio.run(generator.agenerate_summary(REQUEST, timeout=0.2))
+
+
+def test_stream_timeout_raises_timeout_error(generator, monkeypatch):
+    monkeypatch.setattr(fake_gemini, "FAKE_GEMINI_LATENCY", 2)
+
+    async def collect():
+        return [chunk async for chunk in generator.astream_summary(REQUEST, timeout=0.2)]
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(collect())
+
+
+def test_concurrency_cap_works_across_event_loops(generator, monkeypatch):
+    monkeypatch.setattr(gemini_client, "GEMINI_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(gemini_client, "_upstream_slots_by_loop", gemini_client.weakref.WeakKeyDictionary())
+
+    async def contended():
+        # Two calls on one slot, so the second waits on the semaphore
+        return await asyncio.gather(*(generator.agenerate_summary(REQUEST) for _ in range(2)))
+
+    for _ in range(2):
+        assert len(asyncio.run(contended())) == 2
+
+
+def test_unusable_packed_reply_still_counts_its_tokens(fake_server, monkeypatch, generator):
+    monkeypatch.setattr(project_description_generator, "PROJECT_BATCH_MODE", "packed")
+    describer = ProjectDescriptionGenerator()
+    requests = [ProjectDescriptionRequest(project_name=f"Project {n}", skills="Python") for n in range(2)]
+
+    _, packed_tokens = asyncio.run(describer.agenerate_descriptions(requests))
+    monkeypatch.setattr(project_description_generator, "PROJECT_BATCH_MODE", "concurrent")
+    _, one_by_one_tokens = asyncio.run(describer.agenerate_descriptions(requests))
+    assert packed_tokens < one_by_one_tokens
+
+    monkeypatch.setattr(project_description_generator, "PROJECT_BATCH_MODE", "packed")
+    monkeypatch.setattr(fake_gemini, "reply_text", lambda body: "not json")
+    descriptions, tokens_used = asyncio.run(describer.agenerate_descriptions(requests))
+    assert descriptions == ["not json", "not json"]
+    assert tokens_used > one_by_one_tokens
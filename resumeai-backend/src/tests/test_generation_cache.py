@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from generation_endpoints.generation_cache import GenerationCache, MemoryCacheBackend, SQLiteCacheBackend
+from models import SummaryRequest
+
+
+def summary_request(**overrides):
+    fields = {"current_title": "Software Engineer", "years_experience": "5", "skills": "Python, AWS"}
+    return SummaryRequest(**{**fields, **overrides})
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_alookup_and_astore(backend, tmp_path):
+    backend = MemoryCacheBackend() if backend == "memory" else SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"))
+    cache = GenerationCache(backend)
+
+    async def scenario():
+        key, value = await cache.alookup(summary_request(), "model", "1")
+        assert value is None
+        await cache.astore(key, "A summary")
+        # Whitespace differences map to the same entry
+        assert await cache.alookup(summary_request(skills="Python,  AWS "), "model", "1") == (key, "A summary")
+        assert await cache.alookup(summary_request(cache="bypass"), "model", "1") == (key, None)
+        assert (await cache.alookup(summary_request(), "model", "2"))[1] is None
+
+    asyncio.run(scenario())
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+    # The sync and async paths share entries
+    assert cache.lookup(summary_request(), "model", "1")[1] == "A summary"
+
+
+def test_cache_without_backend_is_disabled():
+    cache = GenerationCache(None)
+
+    async def scenario():
+        assert await cache.alookup(summary_request(), "model", "1") == (None, None)
+        await cache.astore(None, "A summary")
+
+    asyncio.run(scenario())
+    assert cache.lookup(summary_request(), "model", "1") == (None, None)
+    cache.store(None, "A summary")
+    assert cache.stats()["hits"] == cache.stats()["misses"] == 0
@@ -0,0 +1,67 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from quota import MemoryQuotaBackend, QuotaEngine, QuotaExceeded, SQLiteQuotaBackend
+
+
+async def ticks_while(awaitable):
+    """
+    Await awaitable, counting how often a concurrent task got to run meanwhile.
+    """
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    try:
+        result = await awaitable
+    finally:
+        ticker.cancel()
+    return result, ticks
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_acharge_and_asettle(backend, tmp_path):
+    backend = MemoryQuotaBackend() if backend == "memory" else SQLiteQuotaBackend(str(tmp_path / "quota.sqlite3"))
+    engine = QuotaEngine(backend, tokens_per_minute=60, burst=100)
+
+    async def scenario():
+        await engine.acharge("key", 80)
+        with pytest.raises(QuotaExceeded) as excinfo:
+            await engine.acharge("key", 80)
+        assert excinfo.value.retry_after > 0
+        with pytest.raises(QuotaExceeded) as excinfo:
+            await engine.acharge("key", 101)
+        assert excinfo.value.retry_after is None
+
+        # Refunding the whole charge makes room for it again
+        await engine.asettle("key", 80, 0)
+        await engine.acharge("key", 80)
+
+    asyncio.run(scenario())
+    assert engine.stats()["allowed"] == 2
+    assert engine.stats()["rejected"] == 2
+
+
+def test_sqlite_acharge_waits_for_the_write_lock_off_the_event_loop(tmp_path):
+    path = str(tmp_path / "quota.sqlite3")
+    engine = QuotaEngine(SQLiteQuotaBackend(path), tokens_per_minute=60, burst=100)
+    # Another worker holds the write lock for a while
+    other_worker = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    other_worker.execute("BEGIN IMMEDIATE")
+    timer = threading.Timer(0.3, other_worker.execute, ("COMMIT",))
+    timer.start()
+    try:
+        _, ticks = asyncio.run(ticks_while(engine.acharge("key", 10)))
+    finally:
+        timer.join()
+        other_worker.close()
+    assert ticks >= 10
+    assert engine.stats()["allowed"] == 1
@@ -0,0 +1,32 @@
+import os
+import time
+
+from render_cache import RenderCache
+
+
+def disk_bytes(cache_dir):
+    return sum(path.stat().st_size for path in cache_dir.iterdir())
+
+
+def test_workers_sharing_a_directory_stay_under_max_bytes(tmp_path):
+    workers = [RenderCache(str(tmp_path), max_bytes=1000), RenderCache(str(tmp_path), max_bytes=1000)]
+    for n in range(6):
+        workers[n % 2].put(f"key{n}", "pdf", b"x" * 300)
+        time.sleep(0.01)  # Distinct mtimes keep the recency order unambiguous
+    assert disk_bytes(tmp_path) <= 1000
+    assert sorted(os.listdir(tmp_path)) == ["key3.pdf", "key4.pdf", "key5.pdf"]
+
+
+def test_eviction_follows_recency_across_workers(tmp_path):
+    first, second = RenderCache(str(tmp_path), max_bytes=1000), RenderCache(str(tmp_path), max_bytes=1000)
+    first.put("old", "tex", b"x" * 300)
+    time.sleep(0.01)
+    first.put("newer", "tex", b"x" * 300)
+    time.sleep(0.01)
+    # A hit in the other worker marks the oldest entry as recently used
+    assert second.get("old", "tex") == b"x" * 300
+    time.sleep(0.01)
+    second.put("newest", "tex", b"x" * 600)
+    assert sorted(os.listdir(tmp_path)) == ["newest.tex", "old.tex"]
+    assert first.get("newer", "tex") is None
+    assert first.stats()["misses"] == 1
@@ -0,0 +1,104 @@
+import asyncio
+import os
+import time
+
+from resume_jobs import ResumeJobQueue
+
+REQUEST = {"information": {"name": "Jane Doe"}, "output_format": "both"}
+
+
+async def render(request_dict):
+    await asyncio.sleep(0.05)
+    return "\\documentclass{article}", b"%PDF-1.5", 1050
+
+
+async def fail(request_dict):
+    raise RuntimeError("boom")
+
+
+def workers(tmp_path, render=render, ttl=60):
+    """
+    Two job queues sharing a job directory, as two worker processes would.
+    """
+    return [ResumeJobQueue(render, workers=1, max_queue=10, ttl=ttl, job_dir=str(tmp_path)) for _ in range(2)]
+
+
+def run(queues, scenario):
+    async def main():
+        for queue in queues:
+            queue.start()
+        try:
+            return await scenario(*queues)
+        finally:
+            for queue in queues:
+                await queue.stop()
+    return asyncio.run(main())
+
+
+def test_jobs_are_visible_from_every_worker(tmp_path):
+    async def scenario(accepting, polled):
+        job = await accepting.submit(REQUEST, user_id=1)
+        seen = await polled.get(job.job_id, user_id=1)
+        assert seen.status in ("queued", "running")
+        finished = await polled.wait(seen, timeout=5)
+        assert finished.status == "done"
+        return await polled.load_result(finished)
+
+    job = run(workers(tmp_path), scenario)
+    assert job.request_dict == REQUEST
+    assert (job.tex_file, job.pdf_file) == ("\\documentclass{article}", b"%PDF-1.5")
+
+
+def test_other_users_and_unknown_ids_see_no_job(tmp_path):
+    async def scenario(accepting, polled):
+        job = await accepting.submit(REQUEST, user_id=1)
+        await accepting.wait(job, timeout=5)
+        return [await polled.get(job.job_id, user_id=2), await polled.get("missing", user_id=1),
+                await polled.get("../" + job.job_id, user_id=1)]
+
+    assert run(workers(tmp_path), scenario) == [None, None, None]
+
+
+def test_failed_job(tmp_path):
+    async def scenario(accepting, polled):
+        job = await accepting.submit(REQUEST, user_id=1)
+        return await polled.wait(await polled.get(job.job_id, user_id=1), timeout=5)
+
+    queues = workers(tmp_path, render=fail)
+    job = run(queues, scenario)
+    assert (job.status, job.error) == ("failed", "Error generating resume")
+    assert queues[0].stats()["failed"] == 1
+
+
+def test_finished_jobs_expire_and_are_swept(tmp_path):
+    async def scenario(accepting, polled):
+        job = await accepting.submit(REQUEST, user_id=1)
+        await accepting.wait(job, timeout=5)
+        return job
+
+    queues = workers(tmp_path, ttl=60)
+    job = run(queues, scenario)
+    assert sorted(os.listdir(tmp_path)) == [f"{job.job_id}.{suffix}" for suffix in ("json", "pdf", "tex")]
+
+    expired = time.time() - 61
+    for name in os.listdir(tmp_path):
+        os.utime(tmp_path / name, (expired, expired))
+    assert queues[1].store.load(job.job_id) is None
+    queues[1].store.sweep()
+    assert os.listdir(tmp_path) == []
+
+
+def test_jobs_settle_their_quota_charge(tmp_path):
+    settled = []
+
+    async def settle(cost):
+        settled.append(cost)
+
+    async def scenario(accepting, polled):
+        job = await accepting.submit(REQUEST, user_id=1, settle=settle)
+        return await accepting.wait(job, timeout=5)
+
+    assert run(workers(tmp_path), scenario).status == "done"
+    assert run(workers(tmp_path, render=fail), scenario).status == "failed"
+    # A failed job is refunded in full
+    assert settled == [1050, 0]
@@ -0,0 +1,72 @@
+"""
+The string renderer must produce byte-identical output to the TexSoup renderer on a golden corpus:
+empty and missing sections, 1-50 experiences and projects, and randomised field text full of
+LaTeX special characters.
+"""
+import copy
+import random
+import string
+
+import pytest
+
+from benchmarks.payloads import make_resume_payload
+from resume_creator import ResumeTexGenerator
+
+SIZES = (0, 1, 5, 20, 50)
+SPECIAL_TEXT = string.ascii_letters + string.digits + " .,;:-'\"\\{}$&%#^_~<>|@!?()[]/*+=\n\t"
+
+
+def random_text(rng, length):
+    return "".join(rng.choice(SPECIAL_TEXT) for _ in range(length))
+
+
+def randomise(payload, rng):
+    """
+    Replace every string in the payload (except output_format) with random text, keeping its shape.
+    Technical skill categories are user-supplied, so their names are randomised too.
+    """
+    def walk(value):
+        if isinstance(value, str):
+            return random_text(rng, rng.randint(0, 40))
+        if isinstance(value, dict):
+            return {key: walk(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [walk(item) for item in value]
+        return value
+
+    randomised = {key: walk(value) for key, value in payload.items() if key != "output_format"}
+    randomised["technical_skills"] = {
+        random_text(rng, 8): skills for skills in randomised["technical_skills"].values()
+    }
+    randomised["output_format"] = payload["output_format"]
+    return randomised
+
+
+def without(*keys):
+    payload = make_resume_payload(2, 2)
+    for key in keys:
+        payload[key] = {} if key == "technical_skills" else []
+    payload["information"]["summary"] = ""
+    return payload
+
+
+def golden_corpus(seed=0, random_cases=200):
+    for experiences in SIZES:
+        for projects in SIZES:
+            yield pytest.param(make_resume_payload(experiences, projects), id=f"{experiences}x{projects}")
+    yield pytest.param(without("education"), id="no-education")
+    yield pytest.param(without("experience", "projects"), id="no-experience-or-projects")
+    yield pytest.param(without("technical_skills", "soft_skills"), id="no-skills")
+
+    rng = random.Random(seed)
+    for case in range(random_cases):
+        payload = randomise(make_resume_payload(rng.randint(0, 4), rng.randint(0, 4)), rng)
+        yield pytest.param(payload, id=f"random-{case}")
+
+
+@pytest.mark.parametrize("payload", list(golden_corpus()))
+def test_string_renderer_matches_texsoup(payload):
+    # Each generator gets its own copy, so neither can see changes the other makes
+    expected = ResumeTexGenerator(copy.deepcopy(payload), renderer="texsoup").generate_tex()
+    actual = ResumeTexGenerator(copy.deepcopy(payload), renderer="string").generate_tex()
+    assert actual == expected
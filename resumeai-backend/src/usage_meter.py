@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from metrics import LLM_TOKENS
+
+
+class UsageMeter:
+    """
+    Records tokens, latency and cache hits per user and endpoint.
+
+    Records are buffered in memory and written to the auth database in batches by a background
+    task, every `flush_interval` seconds or as soon as `batch_size` records are waiting, so metering
+    adds no database round-trip to requests. If writes keep failing, the buffer is capped at
+    `max_buffer` records and the oldest are dropped.
+    """
+
+    def __init__(self, auth_db, flush_interval: float = None, batch_size: int = None, max_buffer: int = None):
+        self.auth_db = auth_db
+        self.flush_interval = flush_interval or float(os.getenv('USAGE_FLUSH_INTERVAL', 5))
+        self.batch_size = batch_size or int(os.getenv('USAGE_FLUSH_BATCH_SIZE', 500))
+        self.max_buffer = max_buffer or int(os.getenv('USAGE_MAX_BUFFER', 50000))
+        self._buffer = []
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+
+    def start(self):
+        """
+        Start the background flush task; call from the running event loop.
+        """
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop the flush task and write out whatever is still buffered.
+        """
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def record(self, user_id: int, endpoint: str, tokens_used: int = None, latency: float = 0.0,
+               cache_hit: bool = False):
+        """
+        Buffer one request's usage. latency is in seconds.
+        """
+        self._buffer.append({
+            "user_id": user_id,
+            "endpoint": endpoint,
+            "tokens_used": tokens_used or 0,
+            "latency_ms": round(latency * 1000),
+            "cache_hit": cache_hit,
+            "created_at": datetime.now(timezone.utc),
+        })
+        self.recorded += 1
+        LLM_TOKENS.inc(endpoint, amount=tokens_used or 0)
+        if len(self._buffer) > self.max_buffer:
+            overflow = len(self._buffer) - self.max_buffer
+            del self._buffer[:overflow]
+            self.dropped += overflow
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self):
+        """
+        Write all buffered records now.
+        """
+        async with self._flush_lock:
+            if not self._buffer:
+                return
+            records, self._buffer = self._buffer, []
+            try:
+                await self.auth_db.record_usage(records)
+                self.written += len(records)
+            except Exception as e:
+                self.failed_flushes += 1
+                logging.getLogger("uvicorn").error("Could not write %s usage records: %s", len(records), e)
+                # Keep them for the next flush, ahead of anything recorded meanwhile
+                self._buffer = records + self._buffer
+                overflow = max(0, len(self._buffer) - self.max_buffer)
+                del self._buffer[:overflow]
+                self.dropped += overflow
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def stats(self):
+        """
+        Get buffer and write counters for monitoring.
+        """
+        return {
+            "buffered": len(self._buffer),
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes,
+        }
@@ -1,6 +1,10 @@
-
+import asyncio
 import re
 import textwrap
+import threading
+import time
+import zipfile
+from collections import OrderedDict
 
 def reduce_tokens(prompt):
     """
@@ -14,4 +18,136 @@ def reduce_tokens(prompt):
     clean_prompt = textwrap.dedent(prompt).strip()
     clean_prompt = re.sub(r"\s+", "", clean_prompt)
 
-    return clean_prompt
\ No newline at end of file
+    return clean_prompt
+
+
+def format_sse(data: str, event: str = None) -> str:
+    """
+    Format a server-sent event. Multi-line data is split across several data fields.
+    Args:
+        data (str): The event payload, usually a JSON string.
+        event (str): Optional event name; unnamed events reach the client's onmessage handler.
+    Returns:
+        str: The encoded event, terminated by a blank line.
+    """
+    lines = [f"event: {event}"] if event else []
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+    return "\n".join(lines) + "\n\n"
+
+
+async def call_backend(backend, method, *args):
+    """
+    Call a storage backend's method without holding up the event loop.
+    Backends marked blocking (on-disk ones) run on a worker thread; in-memory ones are cheaper to call inline.
+    """
+    if backend.blocking:
+        return await asyncio.to_thread(method, *args)
+    return method(*args)
+
+
+class ZipStream:
+    """
+    Build a zip archive incrementally so it can be streamed while entries are still being produced.
+    The archive is written to an unseekable buffer, which makes zipfile emit each entry with a
+    trailing data descriptor instead of seeking back to patch its header.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self.archive = zipfile.ZipFile(self, "w")
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def add(self, name: str, data, compress_type: int = zipfile.ZIP_DEFLATED) -> bytes:
+        """
+        Add an entry and return the archive bytes produced since the last call.
+        """
+        self.archive.writestr(name, data, compress_type=compress_type)
+        return self._take()
+
+    def close(self) -> bytes:
+        """
+        Finish the archive and return its remaining bytes (the central directory).
+        """
+        self.archive.close()
+        return self._take()
+
+    def _take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class TTLCache:
+    """
+    Bounded in-memory cache with least-recently-used eviction and per-entry expiry.
+    Safe to share between the event loop and threadpool workers.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for key, or default if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        """
+        Store value under key, evicting the least recently used entry when full.
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """
+        Remove key from the cache and return its value if present.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[1] if entry else default
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """
+        Get hit/miss counters and current size for monitoring.
+        """
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses
+        }